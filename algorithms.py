@@ -0,0 +1,53 @@
+from collections import deque
+
+import max_flow
+import utils
+
+ALGORITHMS_MAP = {"Ford-Fulkerson": max_flow.ford_fulkerson,
+                  "Edmonds-Karp": max_flow.edmonds_karp,
+                  "Edmonds-Karp (bidirectional)": max_flow.edmonds_karp_bidirectional,
+                  "Capacity Scaling": max_flow.capacity_scaling,
+                  "Capacity Scaling (bidirectional)": max_flow.capacity_scaling_bidirectional,
+                  "Dinic": max_flow.dinic,
+                  "Dinic (dynamic trees)": max_flow.dinic_dynamic_trees,
+                  "Goldberg-Tarjan": max_flow.goldberg_tarjan,
+                  "Goldberg-Tarjan (highest label)": max_flow.goldberg_tarjan_highest_label,
+                  "Boykov-Kolmogorov": max_flow.boykov_kolmogorov
+                  }
+ALGORITHMS = list(ALGORITHMS_MAP.keys())
+
+
+def changed_edges(algorithm: str, result) -> list:
+    # the arcs whose flow one step changed, from the payload an algorithm yields with record set
+    match algorithm:
+        case "Dinic" | "Dinic (dynamic trees)" | "Goldberg-Tarjan" | "Goldberg-Tarjan (highest label)" | "Boykov-Kolmogorov":
+            return result[0]
+        case _:
+            return result
+
+
+class FlowResult:
+
+    def __init__(self, value: int, flows: list[int], source_side: set[int], target_side: set[int]):
+        self.value = value
+        self.flows = flows
+        self.source_side = source_side
+        self.target_side = target_side
+
+    def __str__(self) -> str:
+        return f"value={self.value}, cut={sorted(self.source_side)}"
+
+
+def solve(graph, source: int, target: int, algorithm="Dinic", stats: max_flow.Counters = None) -> FlowResult:
+    # runs an algorithm without building the step payloads of the visualization,
+    # flows[i] is the flow on graph.get_base_edges()[i]
+    algo_func = ALGORITHMS_MAP[algorithm] if isinstance(algorithm, str) else algorithm
+
+    graph.reset()
+    deque(algo_func(graph, source, target, record=False, stats=stats), maxlen=0)
+
+    source_side = utils.saturated_cut(graph, source)
+    return FlowResult(utils.flow_value(graph, source),
+                      [edge.flow for edge in graph.get_base_edges()],
+                      source_side,
+                      set(range(graph.number_of_nodes())) - source_side)
@@ -0,0 +1,86 @@
+import os
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import max_flow
+import snapshot
+import utils
+from algorithms import ALGORITHMS_MAP
+
+
+class BatchResult:
+
+    def __init__(self, values: list[int], cuts: list[set[int]] = None):
+        self.values = values
+        self.cuts = cuts
+
+
+def solve_scenarios(graph, source: int, target: int, capacities: list, algorithm: str = "Dinic",
+                    warm_start: bool = True, cuts: bool = False) -> tuple[list[int], list[set[int]]]:
+    # solves consecutive scenarios on one graph, column k of capacities is the capacity of its k-th base edge
+    edges = graph.get_base_edges()
+
+    values = []
+    source_sides = []
+    for i, row in enumerate(capacities):
+        if i > 0 and warm_start:
+            # repair the maximum flow of the previous scenario
+            max_flow.update_capacities(graph, source, target,
+                                       [(edge, capacity - edge.capacity)
+                                        for edge, capacity in zip(edges, row) if capacity != edge.capacity])
+        else:
+            for edge, capacity in zip(edges, row):
+                edge.capacity = capacity
+            graph.reset()
+            deque(ALGORITHMS_MAP[algorithm](graph, source, target, record=False), maxlen=0)
+
+        values.append(utils.flow_value(graph, source))
+        if cuts:
+            source_sides.append(utils.saturated_cut(graph, source))
+    return values, source_sides
+
+
+def solve_snapshot_scenarios(path: str, capacities: list, algorithm: str, warm_start: bool,
+                             cuts: bool) -> tuple[list[int], list[set[int]]]:
+    # runs in a worker process: the topology is mapped from the snapshot, so the workers share its pages
+    # and only the capacities and flows they write are copied
+    source, target, graph = snapshot.load(path)
+    return solve_scenarios(graph, source, target, capacities, algorithm, warm_start, cuts)
+
+
+def solve_batch(graph, source: int, target: int, capacities, workers: int = 1, cuts: bool = False,
+                warm_start: bool = True, algorithm: str = "Dinic") -> BatchResult:
+    # one scenario per row of capacities, column k is the capacity of graph.get_base_edges()[k],
+    # every worker warm starts inside its contiguous block of scenarios
+    rows = [array("q", row) for row in capacities]
+    if any(len(row) != len(graph.get_base_edges()) for row in rows):
+        raise ValueError("every capacity vector needs one capacity per base edge")
+    if not rows:
+        return BatchResult([], [] if cuts else None)
+
+    workers = min(workers, len(rows))
+    if workers <= 1:
+        values, source_sides = solve_scenarios(graph.copy(), source, target, rows, algorithm, warm_start, cuts)
+        return BatchResult(values, source_sides if cuts else None)
+
+    # the workers get the topology as a snapshot file instead of a pickled copy each
+    descriptor, path = tempfile.mkstemp(suffix=".snapshot")
+    os.close(descriptor)
+    try:
+        snapshot.save(path, graph, source, target)
+        size = -(-len(rows) // workers)
+        blocks = [rows[i:i + size] for i in range(0, len(rows), size)]
+        values, source_sides = [], []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(solve_snapshot_scenarios, path, block, algorithm, warm_start, cuts)
+                       for block in blocks]
+            for future in futures:
+                block_values, block_source_sides = future.result()
+                values.extend(block_values)
+                source_sides.extend(block_source_sides)
+    finally:
+        os.remove(path)
+
+    return BatchResult(values, source_sides if cuts else None)
@@ -0,0 +1,468 @@
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from collections import deque
+
+from tabulate import tabulate
+
+import batch
+import dimacs
+import frontier
+import max_flow
+import parallel_push_relabel
+import random_graph
+import snapshot
+import utils
+from algorithms import ALGORITHMS_MAP, ALGORITHMS, solve
+from csr_graph import CSRGraph
+from graph import Graph
+
+GRAPH_BACKENDS = {"Graph": Graph,
+                  "CSRGraph": CSRGraph
+                  }
+
+
+def random_topology(arcs: int, seed: int = 0):
+    rng = random.Random(seed)
+    edges = arcs // 2
+    n = max(2, edges // 4)
+    return n, [(rng.randrange(n), rng.randrange(n), rng.randint(1, 100)) for _ in range(edges)]
+
+
+def measure(func):
+    # tracing allocations slows the run down, so time and memory are taken from separate runs
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    gc.collect()
+    start_time = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start_time
+    return result, elapsed, memory
+
+
+def build_graph(backend, n: int, edges):
+    graph = backend(n)
+    for start, end, capacity in edges:
+        graph.add_edge(start, end, capacity)
+    if isinstance(graph, CSRGraph):
+        graph.ensure_built()
+    return graph
+
+
+def solved_memory(backend, n: int, edges):
+    # memory held by a graph after an algorithm went over its arcs, with the flow in place
+    gc.collect()
+    tracemalloc.start()
+    graph = build_graph(backend, n, edges)
+    solve(graph, 0, n - 1)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del graph
+    return memory
+
+
+def compare_graph_backends(sizes=(10_000, 100_000, 1_000_000)):
+    rows = []
+    for arcs in sizes:
+        n, edges = random_topology(arcs)
+        for name, backend in GRAPH_BACKENDS.items():
+            memory = solved_memory(backend, n, edges)
+            graph, build_time, built_memory = measure(lambda: build_graph(backend, n, edges))
+
+            start_time = time.perf_counter()
+            graph.reset()
+            reset_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            utils.saturated_cut(graph, 0)
+            traversal_time = time.perf_counter() - start_time
+
+            rows.append([arcs, name, built_memory / 2 ** 20, memory / 2 ** 20, memory / arcs,
+                         build_time, reset_time, traversal_time])
+            del graph
+    return rows
+
+
+def compare_incremental(nodes=(100, 400, 1600), capacity: int = 20, instances: int = 3, changes: int = 20, seed: int = 0):
+    # random capacity increases and decreases, re-solved from zero flow vs. repaired from the previous flow
+    rng = random.Random(seed)
+    rows = []
+    for n in nodes:
+        scratch_time = incremental_time = 0
+        for _ in range(instances):
+            source, target, graph = random_graph.generate(n, capacity, rng.randrange(2 ** 32))
+            graph.reset()
+            for _ in max_flow.dinic(graph, source, target):
+                pass
+
+            for _ in range(changes):
+                index = rng.randrange(len(graph.get_base_edges()))
+                edge = graph.get_base_edges()[index]
+                delta = rng.randint(-edge.capacity, capacity)
+
+                graph_scratch = graph.copy()
+                graph_scratch.get_base_edges()[index].capacity += delta
+                start_time = time.perf_counter()
+                for _ in max_flow.dinic(graph_scratch, source, target):
+                    pass
+                scratch_time += time.perf_counter() - start_time
+
+                start_time = time.perf_counter()
+                max_flow.update_capacities(graph, source, target, [(edge, delta)])
+                incremental_time += time.perf_counter() - start_time
+
+                assert utils.flow_value(graph, source) == utils.flow_value(graph_scratch, source)
+
+        rows.append([n, instances * changes, scratch_time, incremental_time, scratch_time / incremental_time])
+    return rows
+
+
+def compare_loading(sizes=(10_000, 100_000, 1_000_000)):
+    # the same instance parsed from DIMACS text and mapped from a snapshot, both until the csr arrays exist
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for arcs in sizes:
+            n, edges = random_topology(arcs)
+            graph = build_graph(CSRGraph, n, edges)
+            dimacs_path = os.path.join(directory, "instance.max")
+            snapshot_path = os.path.join(directory, "instance.snapshot")
+            dimacs.write(dimacs_path, graph, 0, n - 1)
+            snapshot.save(snapshot_path, graph, 0, n - 1)
+            del graph
+
+            start_time = time.perf_counter()
+            _, _, graph = dimacs.read(dimacs_path)
+            graph.ensure_built()
+            dimacs_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            _, _, graph = snapshot.load(snapshot_path)
+            snapshot_time = time.perf_counter() - start_time
+
+            rows.append([arcs, os.path.getsize(dimacs_path) / 2 ** 20, os.path.getsize(snapshot_path) / 2 ** 20,
+                         dimacs_time, snapshot_time])
+            del graph
+    return rows
+
+
+def compare_bfs(nodes=(100, 400, 1600, 6400, 25600), capacity: int = 20, repetitions: int = 5, seed: int = 0):
+    # one source to target search on a zero flow, the frontier search pays a fixed numpy overhead per level
+    rng = random.Random(seed)
+    rows = []
+    for n in nodes:
+        source, target, graph = random_graph.generate(n, capacity, rng.randrange(2 ** 32))
+        csr = CSRGraph.from_graph(graph)
+        graph.reset()
+        csr.reset()
+
+        times = [min(timeit.repeat(lambda: search(searched, source, target), number=1, repeat=repetitions))
+                 for search, searched in ((max_flow.bfs, graph), (max_flow.bfs, csr), (frontier.bfs, csr))]
+        rows.append([n, csr.number_of_edges(), *times, min(times[:2]) / times[2]])
+    return rows
+
+
+def compare_bidirectional(nodes=(400, 1600, 6400), capacity: int = 20, seed: int = 0,
+                          pairs=(("Edmonds-Karp", "Edmonds-Karp (bidirectional)"),
+                                 ("Capacity Scaling", "Capacity Scaling (bidirectional)"))):
+    # whole runs, the searches differ in the arcs they scan before the path is found
+    rng = random.Random(seed)
+    rows = []
+    for n in nodes:
+        source, target, graph = random_graph.generate(n, capacity, rng.randrange(2 ** 32))
+        for single, bidirectional in pairs:
+            row = [n]
+            for name in (single, bidirectional):
+                stats = max_flow.Counters()
+                start_time = time.perf_counter()
+                solve(graph, source, target, name, stats)
+                row += [time.perf_counter() - start_time, stats.arcs_scanned / stats.searches]
+            rows.append([row[0], single, *row[1:], row[2] / row[4]])
+    return rows
+
+
+def compare_batch(nodes: int = 400, capacity: int = 20, scenarios: int = 50, changes: int = 5, workers: int = 4,
+                  seed: int = 0):
+    # what-if sweep: every scenario changes a few capacities of the base capacities
+    rng = random.Random(seed)
+    source, target, graph = random_graph.generate(nodes, capacity, rng.randrange(2 ** 32))
+    base = [edge.capacity for edge in graph.get_base_edges()]
+    capacities = []
+    for _ in range(scenarios):
+        row = list(base)
+        for _ in range(changes):
+            row[rng.randrange(len(row))] = rng.randint(0, 2 * capacity)
+        capacities.append(row)
+
+    def copy_and_solve():
+        values = []
+        for row in capacities:
+            graph_copy = graph.copy()
+            for edge, edge_capacity in zip(graph_copy.get_base_edges(), row):
+                edge.capacity = edge_capacity
+            values.append(solve(graph_copy, source, target).value)
+        return values
+
+    runs = [("copy and solve", copy_and_solve),
+            ("batch", lambda: batch.solve_batch(graph, source, target, capacities, warm_start=False).values),
+            ("batch, warm start", lambda: batch.solve_batch(graph, source, target, capacities).values),
+            (f"batch, warm start, {workers} workers",
+             lambda: batch.solve_batch(graph, source, target, capacities, workers=workers).values)]
+
+    rows = []
+    expected = None
+    for name, run in runs:
+        start_time = time.perf_counter()
+        values = run()
+        elapsed = time.perf_counter() - start_time
+        expected = expected or values
+        assert values == expected
+        rows.append([name, scenarios, elapsed, elapsed / scenarios])
+    return rows
+
+
+def long_path_graph(length: int, branches: int) -> tuple[int, int, Graph]:
+    # a path of length arcs from the source to a hub that fans out into branches unit arcs to the target:
+    # one phase with branches augmenting paths that all share the path
+    target = length + branches + 1
+    graph = Graph(target + 1)
+    for u in range(length):
+        graph.add_edge(u, u + 1, branches)
+    for i in range(branches):
+        graph.add_edge(length, length + 1 + i, 1)
+        graph.add_edge(length + 1 + i, target, 1)
+    return 0, target, graph
+
+
+def compare_long_paths(lengths=(250, 500, 1000, 2000), algorithms=("Dinic", "Dinic (dynamic trees)")):
+    # plain Dinic walks the whole path on every augmentation, the dynamic trees only link it once
+    rows = []
+    for length in lengths:
+        source, target, graph = long_path_graph(length, length)
+        times = []
+        for name in algorithms:
+            start_time = time.perf_counter()
+            value = solve(graph, source, target, name).value
+            times.append(time.perf_counter() - start_time)
+            assert value == length
+        rows.append([length, length, *times, times[0] / times[-1]])
+    return rows
+
+
+def compare_parallel(nodes: int = 6400, capacity: int = 20, workers=None, seed: int = 0):
+    # one region per worker process, so rounds and boundary traffic grow with the number of workers
+    rng = random.Random(seed)
+    source, target, graph = random_graph.generate(nodes, capacity, rng.randrange(2 ** 32))
+    start_time = time.perf_counter()
+    expected = solve(graph, source, target, "Goldberg-Tarjan").value
+    rows = [["Goldberg-Tarjan", 1, time.perf_counter() - start_time, None, None]]
+
+    counts = workers or sorted({1, *(2 ** k for k in range(os.cpu_count().bit_length())), os.cpu_count()})
+    for count in counts:
+        stats = max_flow.Counters()
+        start_time = time.perf_counter()
+        value = parallel_push_relabel.parallel_push_relabel(graph, source, target, count, stats=stats)
+        elapsed = time.perf_counter() - start_time
+        assert value == expected
+        rows.append(["parallel push-relabel", count, elapsed, stats.phases, None])
+    for row in rows[1:]:
+        row[4] = rows[1][2] / row[2]
+    return rows
+
+
+def run_algorithm(algo_func, graph, source: int, target: int, stats: max_flow.Counters = None):
+    graph.reset()
+    deque(algo_func(graph, source, target, record=False, stats=stats), maxlen=0)
+
+
+def benchmark_algorithms(nodes=(100, 400), capacities=(10, 1000), instances: int = 2, warmup: int = 1,
+                         repetitions: int = 3, algorithms=None, seed: int = 0):
+    # one record per algorithm and instance, throughput in augmentations and pushes per second of the best time
+    rng = random.Random(seed)
+    records = []
+    for n in nodes:
+        for capacity in capacities:
+            for instance in range(instances):
+                source, target, graph = random_graph.generate(n, capacity, rng.randrange(2 ** 32))
+
+                for name in algorithms or ALGORITHMS:
+                    algo_func = ALGORITHMS_MAP[name]
+                    for _ in range(warmup):
+                        run_algorithm(algo_func, graph, source, target)
+
+                    times = []
+                    for _ in range(repetitions):
+                        start_time = time.perf_counter()
+                        run_algorithm(algo_func, graph, source, target)
+                        times.append(time.perf_counter() - start_time)
+
+                    # separate run for memory and operation counts, both would distort the timings
+                    stats = max_flow.Counters()
+                    gc.collect()
+                    tracemalloc.start()
+                    run_algorithm(algo_func, graph, source, target, stats)
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+                    best_time = min(times)
+                    pushes = stats.saturating_pushes + stats.non_saturating_pushes
+                    records.append({"algorithm": name,
+                                    "nodes": n,
+                                    "capacity": capacity,
+                                    "instance": instance,
+                                    "arcs": graph.number_of_edges(),
+                                    "flow": utils.flow_value(graph, source),
+                                    "best_time": best_time,
+                                    "mean_time": statistics.mean(times),
+                                    "peak_memory": peak_memory,
+                                    "augmentations_per_second": stats.augmentations / best_time if best_time > 0 else 0,
+                                    "pushes_per_second": pushes / best_time if best_time > 0 else 0,
+                                    **stats.as_dict()})
+    return records
+
+
+def summarize(records: list[dict]):
+    groups = {}
+    for record in records:
+        groups.setdefault((record["nodes"], record["capacity"], record["algorithm"]), []).append(record)
+
+    return [[nodes, capacity, algorithm,
+             statistics.mean(record["best_time"] for record in group),
+             statistics.mean(record["peak_memory"] for record in group) / 2 ** 10,
+             statistics.mean(record["augmentations"] for record in group),
+             statistics.mean(record["augmentations_per_second"] for record in group),
+             statistics.mean(record["saturating_pushes"] + record["non_saturating_pushes"] for record in group),
+             statistics.mean(record["pushes_per_second"] for record in group),
+             statistics.mean(record["arcs_scanned"] for record in group),
+             statistics.mean(record["relabels"] for record in group)]
+            for (nodes, capacity, algorithm), group in groups.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="headless benchmarks of the max-flow algorithms")
+    parser.add_argument("--json", metavar="PATH", help="also write the raw results as json")
+    subparsers = parser.add_subparsers(dest="command")
+
+    parser_algorithms = subparsers.add_parser("algorithms", help="all algorithms on random_graph instances")
+    parser_algorithms.add_argument("--nodes", type=int, nargs="+", default=[100, 400])
+    parser_algorithms.add_argument("--capacities", type=int, nargs="+", default=[10, 1000])
+    parser_algorithms.add_argument("--instances", type=int, default=2)
+    parser_algorithms.add_argument("--warmup", type=int, default=1)
+    parser_algorithms.add_argument("--repetitions", type=int, default=3)
+    parser_algorithms.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, metavar="NAME")
+    parser_algorithms.add_argument("--seed", type=int, default=0)
+
+    parser_graphs = subparsers.add_parser("graphs", help="memory and speed of the graph backends")
+    parser_graphs.add_argument("--arcs", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    parser_loading = subparsers.add_parser("loading", help="DIMACS parsing vs. mapping a snapshot")
+    parser_loading.add_argument("--arcs", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+
+    parser_bfs = subparsers.add_parser("bfs", help="scalar vs. numpy frontier breadth-first search")
+    parser_bfs.add_argument("--nodes", type=int, nargs="+", default=[100, 400, 1600, 6400, 25600])
+    parser_bfs.add_argument("--repetitions", type=int, default=5)
+    parser_bfs.add_argument("--seed", type=int, default=0)
+
+    parser_bidirectional = subparsers.add_parser("bidirectional", help="single vs. bidirectional path searches")
+    parser_bidirectional.add_argument("--nodes", type=int, nargs="+", default=[400, 1600, 6400])
+    parser_bidirectional.add_argument("--seed", type=int, default=0)
+
+    parser_batch = subparsers.add_parser("batch", help="batched scenarios vs. copying and solving each")
+    parser_batch.add_argument("--nodes", type=int, default=400)
+    parser_batch.add_argument("--scenarios", type=int, default=50)
+    parser_batch.add_argument("--changes", type=int, default=5)
+    parser_batch.add_argument("--workers", type=int, default=4)
+    parser_batch.add_argument("--seed", type=int, default=0)
+
+    parser_paths = subparsers.add_parser("paths", help="Dinic with and without dynamic trees on long paths")
+    parser_paths.add_argument("--lengths", type=int, nargs="+", default=[250, 500, 1000, 2000])
+
+    parser_parallel = subparsers.add_parser("parallel", help="parallel push-relabel from 1 to all cores")
+    parser_parallel.add_argument("--nodes", type=int, default=6400)
+    parser_parallel.add_argument("--workers", type=int, nargs="+")
+    parser_parallel.add_argument("--seed", type=int, default=0)
+
+    parser_incremental = subparsers.add_parser("incremental", help="warm-started updates vs. solving from scratch")
+    parser_incremental.add_argument("--nodes", type=int, nargs="+", default=[100, 400, 1600])
+    parser_incremental.add_argument("--changes", type=int, default=20)
+    parser_incremental.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command is None:
+        args = parser.parse_args(sys.argv[1:] + ["algorithms"])
+
+    match args.command:
+        case "graphs":
+            headers = ["arcs", "backend", "built (MiB)", "solved (MiB)", "bytes per arc solved", "build (s)", "reset (s)",
+                       "traversal (s)"]
+            rows = compare_graph_backends(args.arcs)
+            print(tabulate(rows, headers=headers, floatfmt=".3f"))
+            results = [dict(zip(headers, row)) for row in rows]
+        case "loading":
+            headers = ["arcs", "DIMACS (MiB)", "snapshot (MiB)", "DIMACS load (s)", "snapshot load (s)"]
+            rows = compare_loading(args.arcs)
+            print(tabulate(rows, headers=headers, floatfmt=".4f"))
+            results = [dict(zip(headers, row)) for row in rows]
+        case "bfs":
+            headers = ["nodes", "arcs", "scalar Graph (s)", "scalar CSRGraph (s)", "frontier CSRGraph (s)", "speedup"]
+            rows = compare_bfs(args.nodes, repetitions=args.repetitions, seed=args.seed)
+            print(tabulate(rows, headers=headers, floatfmt=".5f"))
+            crossover = next((row[0] for row in rows if row[-1] > 1), None)
+            print(f"frontier search faster from {crossover} nodes" if crossover is not None
+                  else "frontier search not faster on these sizes")
+            results = [dict(zip(headers, row)) for row in rows]
+        case "bidirectional":
+            headers = ["nodes", "algorithm", "time (s)", "arcs per search", "bidirectional time (s)",
+                       "bidirectional arcs per search", "arc reduction"]
+            rows = compare_bidirectional(args.nodes, seed=args.seed)
+            print(tabulate(rows, headers=headers, floatfmt=".3f"))
+            results = [dict(zip(headers, row)) for row in rows]
+        case "batch":
+            headers = ["method", "scenarios", "time (s)", "time per scenario (s)"]
+            rows = compare_batch(args.nodes, scenarios=args.scenarios, changes=args.changes, workers=args.workers,
+                                 seed=args.seed)
+            print(tabulate(rows, headers=headers, floatfmt=".4f"))
+            results = [dict(zip(headers, row)) for row in rows]
+        case "paths":
+            headers = ["path length", "branches", "Dinic (s)", "Dinic, dynamic trees (s)", "speedup"]
+            rows = compare_long_paths(args.lengths)
+            print(tabulate(rows, headers=headers, floatfmt=".4f"))
+            results = [dict(zip(headers, row)) for row in rows]
+        case "parallel":
+            headers = ["solver", "workers", "time (s)", "rounds", "speedup over 1 worker"]
+            rows = compare_parallel(args.nodes, workers=args.workers, seed=args.seed)
+            print(tabulate(rows, headers=headers, floatfmt=".3f"))
+            results = [dict(zip(headers, row)) for row in rows]
+        case "incremental":
+            headers = ["nodes", "changes", "from scratch (s)", "incremental (s)", "speedup"]
+            rows = compare_incremental(args.nodes, changes=args.changes, seed=args.seed)
+            print(tabulate(rows, headers=headers, floatfmt=".3f"))
+            results = [dict(zip(headers, row)) for row in rows]
+        case _:
+            results = benchmark_algorithms(args.nodes, args.capacities, args.instances, args.warmup,
+                                           args.repetitions, args.algorithms, args.seed)
+            print(tabulate(summarize(results),
+                           headers=["nodes", "capacity", "algorithm", "time (s)", "peak memory (KiB)",
+                                    "augmentations", "augmentations/s", "pushes", "pushes/s", "arcs scanned",
+                                    "relabels"],
+                           floatfmt=".4f"))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
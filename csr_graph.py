@@ -0,0 +1,305 @@
+import math
+from array import array
+from contextlib import contextmanager
+
+from graph import Node
+
+
+class CSRArc:
+    # start, end and reverse are fixed for the arrays an arc was made for, the other fields are read through
+    __slots__ = ("graph", "index", "start", "end", "reverse")
+
+    def __init__(self, graph, index: int):
+        self.graph = graph
+        self.index = index
+        self.start = graph.tail[index]
+        self.end = graph.head[index]
+        self.reverse = bool(graph.is_reverse[index])
+
+    @property
+    def capacity(self):
+        return self.graph.capacity[self.index]
+
+    @capacity.setter
+    def capacity(self, value):
+        self.graph.capacity[self.index] = value
+
+    @property
+    def flow(self):
+        return self.graph.flow[self.index]
+
+    @flow.setter
+    def flow(self, value):
+        self.graph.flow[self.index] = value
+
+    @property
+    def prev_flow(self):
+        return self.graph.prev_flow[self.index]
+
+    @prev_flow.setter
+    def prev_flow(self, value):
+        self.graph.prev_flow[self.index] = value
+
+    @property
+    def reverse_edge(self):
+        return CSRArc(self.graph, self.graph.pair[self.index])
+
+    def residual_capacity(self):
+        return self.graph.residual_capacity(self.index)
+
+    def adjust(self, delta):
+        self.graph.adjust(self.index, delta)
+
+    def __eq__(self, other):
+        return isinstance(other, CSRArc) and self.graph is other.graph and self.index == other.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+
+# residual graph in flat typed arrays: the arcs of node u are the positions offsets[u]
+# to offsets[u + 1], arc i goes from tail[i] to head[i] and pair[i] is its reverse arc
+class CSRGraph:
+
+    def __init__(self, n: int):
+        rows = math.ceil(math.sqrt(n))
+        padding = 1 / (2 * rows)
+        self.x = array("d", ((i % rows) / rows + padding for i in range(n)))
+        self.y = array("d", ((i // rows) / rows + padding for i in range(n)))
+        self.n = n
+
+        # edges in insertion order, the csr arrays are (re)built from them on demand
+        self._starts = array("i")
+        self._ends = array("i")
+        self._capacities = array("q")
+        self._flows = array("q")
+        self._dirty = False
+
+        self.offsets = array("i", [0] * (n + 1))
+        self.head = array("i")
+        self.tail = array("i")
+        self.capacity = array("q")
+        self.flow = array("q")
+        self.prev_flow = array("q")
+        self.pair = array("i")
+        self.is_reverse = array("b")
+        self.order = array("i")
+        self._edge_index = None
+        # CSRArc lists per node, only kept inside cached_arcs blocks
+        self._node_arcs = None
+        self._arc_users = 0
+
+    def add_edge(self, start: int, end: int, capacity: int):
+        if not self._dirty:
+            self._store()
+        self._starts.append(start)
+        self._ends.append(end)
+        self._capacities.append(capacity)
+        self._flows.append(0)
+        self._dirty = True
+
+    def add_edges(self, starts, ends, capacities):
+        if not self._dirty:
+            self._store()
+        self._starts.extend(starts)
+        self._ends.extend(ends)
+        self._capacities.extend(capacities)
+        self._flows.extend([0] * (len(self._starts) - len(self._flows)))
+        self._dirty = True
+
+    def _store(self):
+        # write capacities and flows changed through the csr arrays back to the edge list
+        if self._starts is None:
+            self._derive_edge_list()
+        for position, arc_id in enumerate(self.order):
+            if arc_id % 2 == 0:
+                self._capacities[arc_id // 2] = self.capacity[position]
+                self._flows[arc_id // 2] = self.flow[position]
+
+    def _derive_edge_list(self):
+        # graphs loaded from a snapshot only have the csr arrays until edges are added or the graph is copied
+        m = len(self.head) // 2
+        self._starts = array("i", bytes(4 * m))
+        self._ends = array("i", bytes(4 * m))
+        self._capacities = array("q", bytes(8 * m))
+        self._flows = array("q", bytes(8 * m))
+        for position, arc_id in enumerate(self.order):
+            if arc_id % 2 == 0:
+                self._starts[arc_id // 2] = self.tail[position]
+                self._ends[arc_id // 2] = self.head[position]
+
+    def _build(self):
+        n = self.n
+        m = 2 * len(self._starts)
+
+        degree = [0] * (n + 1)
+        for start, end in zip(self._starts, self._ends):
+            degree[start + 1] += 1
+            degree[end + 1] += 1
+        for i in range(n):
+            degree[i + 1] += degree[i]
+        self.offsets = array("i", degree)
+
+        # stable counting sort by tail, arcs 2k and 2k + 1 are edge k and its reverse
+        position = degree[:n]
+        head, tail, capacity, flow = [0] * m, [0] * m, [0] * m, [0] * m
+        pair, is_reverse, order = [0] * m, [0] * m, [0] * m
+        for k, (start, end) in enumerate(zip(self._starts, self._ends)):
+            i = position[start]
+            position[start] = i + 1
+            j = position[end]
+            position[end] = j + 1
+
+            head[i], tail[i], pair[i], order[i] = end, start, j, 2 * k
+            capacity[i], flow[i] = self._capacities[k], self._flows[k]
+            head[j], tail[j], pair[j], order[j] = start, end, i, 2 * k + 1
+            is_reverse[j] = 1
+
+        self.head = array("i", head)
+        self.tail = array("i", tail)
+        self.capacity = array("q", capacity)
+        self.flow = array("q", flow)
+        self.pair = array("i", pair)
+        self.is_reverse = array("b", is_reverse)
+        self.order = array("i", order)
+        self.prev_flow = array("q", bytes(8 * m))
+        self._edge_index = None
+        if self._node_arcs is not None:
+            self._node_arcs = [None] * n
+        self._dirty = False
+
+    def ensure_built(self):
+        # (re)builds the csr arrays if edges were added since the last build
+        if self._dirty:
+            self._build()
+
+    def residual_capacity(self, arc: int):
+        if self.is_reverse[arc]:
+            return self.flow[self.pair[arc]]
+        else:
+            return self.capacity[arc] - self.flow[arc]
+
+    def adjust(self, arc: int, delta):
+        if self.is_reverse[arc]:
+            self.flow[self.pair[arc]] -= delta
+        else:
+            self.flow[arc] += delta
+
+    def _ensure_index(self):
+        self.ensure_built()
+        if self._edge_index is None:
+            self._edge_index = {}
+            for i in range(len(self.head)):
+                self._edge_index.setdefault((self.tail[i], self.head[i]), []).append(i)
+        return self._edge_index
+
+    def arcs(self, node: int):
+        self.ensure_built()
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    @contextmanager
+    def cached_arcs(self):
+        # get_edges_by_node makes new proxies on every call; inside this block the lists are kept, for algorithms
+        # that scan the same nodes many times, and dropped when the outermost block ends
+        if self._arc_users == 0:
+            self._node_arcs = [None] * self.n
+        self._arc_users += 1
+        try:
+            yield
+        finally:
+            self._arc_users -= 1
+            if self._arc_users == 0:
+                self._node_arcs = None
+
+    def get_edges_by_node(self, node: int):
+        self.ensure_built()
+        if self._node_arcs is None:
+            return [CSRArc(self, i) for i in range(self.offsets[node], self.offsets[node + 1])]
+        arcs = self._node_arcs[node]
+        if arcs is None:
+            arcs = self._node_arcs[node] = [CSRArc(self, i) for i in range(self.offsets[node], self.offsets[node + 1])]
+        return arcs
+
+    def get_degree(self, node: int):
+        self.ensure_built()
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def get_edges(self):
+        self.ensure_built()
+        for i in range(len(self.head)):
+            yield CSRArc(self, i)
+
+    def get_base_edges(self):
+        self.ensure_built()
+        return [CSRArc(self, i) for i in range(len(self.head)) if not self.is_reverse[i]]
+
+    def get_edges_between(self, start: int, end: int):
+        return [CSRArc(self, i) for i in self._ensure_index().get((start, end), [])]
+
+    def has_edge(self, start: int, end: int):
+        return (start, end) in self._ensure_index()
+
+    def get_pairs(self):
+        return [(start, end) for start, end in self._ensure_index() if start < end]
+
+    def get_nodes(self):
+        return [Node(i, self.x[i], self.y[i]) for i in range(self.n)]
+
+    def get_node(self, node_id: int):
+        return Node(node_id, self.x[node_id], self.y[node_id])
+
+    def number_of_nodes(self):
+        return self.n
+
+    def number_of_edges(self):
+        return len(self.head) if self._starts is None else 2 * len(self._starts)
+
+    def reset(self):
+        self.ensure_built()
+        m = len(self.head)
+        self.flow = array("q", bytes(8 * m))
+        # residual capacity of a reverse arc is 0 without flow
+        self.prev_flow = array("q", self.capacity)
+
+    def copy(self, with_flow: bool = False):
+        if not self._dirty:
+            self._store()
+        graph_copy = CSRGraph(self.n)
+        graph_copy.x = array("d", self.x)
+        graph_copy.y = array("d", self.y)
+        graph_copy.add_edges(self._starts, self._ends, self._capacities)
+        if with_flow:
+            graph_copy._flows = array("q", self._flows)
+        return graph_copy
+
+    @classmethod
+    def from_arrays(cls, n: int, arrays: dict):
+        # wraps finished csr arrays (e.g. memoryviews of a snapshot) without copying them,
+        # flow and prev_flow default to zero
+        graph = cls.__new__(cls)
+        graph.n = n
+        graph._starts = graph._ends = graph._capacities = graph._flows = None
+        graph._dirty = False
+        graph._edge_index = None
+        graph._node_arcs = None
+        graph._arc_users = 0
+        for name, values in arrays.items():
+            setattr(graph, name, values)
+        m = len(graph.head)
+        if "flow" not in arrays:
+            graph.flow = array("q", bytes(8 * m))
+        if "prev_flow" not in arrays:
+            graph.prev_flow = array("q", bytes(8 * m))
+        return graph
+
+    @classmethod
+    def from_graph(cls, graph, with_flow: bool = False):
+        csr = cls(graph.number_of_nodes())
+        for i, node in enumerate(graph.get_nodes()):
+            csr.x[i] = node.x
+            csr.y[i] = node.y
+        for edge in graph.get_base_edges():
+            csr.add_edge(edge.start, edge.end, edge.capacity)
+            if with_flow:
+                csr._flows[-1] = edge.flow
+        return csr
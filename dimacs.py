@@ -0,0 +1,146 @@
+import argparse
+import mmap
+import os
+from array import array
+from collections import deque
+
+import utils
+from algorithms import ALGORITHMS_MAP, ALGORITHMS
+from csr_graph import CSRGraph
+
+# bytes parsed before the arcs are appended to the graph in bulk, lines written at once
+BLOCK = 1 << 22
+CHUNK = 1 << 16
+
+
+def read(path: str) -> tuple[int, int, CSRGraph]:
+    # streams a DIMACS max-flow file (p max, n ... s/t, a lines, 1-based node ids) through a memory map,
+    # blocks holding only arc lines are split at once, all other blocks line by line
+    if os.path.getsize(path) == 0:
+        raise ValueError(f"{path} is empty")
+
+    graph = None
+    source = target = None
+    starts, ends, capacities = array("i"), array("i"), array("q")
+
+    def flush():
+        if starts and (min(starts) < 0 or min(ends) < 0 or max(starts) >= graph.n or max(ends) >= graph.n):
+            raise ValueError("arc with a node id outside of 1 .. nodes")
+        graph.add_edges(starts, ends, capacities)
+        del starts[:], ends[:], capacities[:]
+
+    def parse(line: bytes):
+        nonlocal graph, source, target
+        kind = line[:1]
+        if kind == b"a":
+            _, start, end, capacity = line.split()
+            starts.append(int(start) - 1)
+            ends.append(int(end) - 1)
+            capacities.append(int(capacity))
+        elif kind == b"n":
+            _, node, role = line.split()
+            if role == b"s":
+                source = int(node) - 1
+            elif role == b"t":
+                target = int(node) - 1
+            else:
+                raise ValueError(f"unknown node designator {role.decode()}")
+        elif kind == b"p":
+            _, problem, nodes, _ = line.split()
+            if problem != b"max":
+                raise ValueError(f"{problem.decode()} is not a max-flow problem")
+            graph = CSRGraph(int(nodes))
+        elif kind not in (b"c", b""):
+            raise ValueError(f"unknown line type {kind.decode()}")
+
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        position = 0
+        line_number = 0
+        while position < len(buffer):
+            end = buffer.find(b"\n", position + BLOCK)
+            end = len(buffer) if end < 0 else end + 1
+            block = buffer[position:end]
+            tokens = block.split()
+            lines = block.count(b"\n") + (not block.endswith(b"\n"))
+
+            try:
+                if graph is not None and len(tokens) == 4 * lines and tokens[::4].count(b"a") == lines:
+                    starts.extend([int(token) - 1 for token in tokens[1::4]])
+                    ends.extend([int(token) - 1 for token in tokens[2::4]])
+                    capacities.extend([int(token) for token in tokens[3::4]])
+                    line_number += lines
+                else:
+                    for line in block.splitlines():
+                        line_number += 1
+                        parse(line)
+                if graph is not None:
+                    flush()
+            except (ValueError, TypeError, AttributeError) as exception:
+                raise ValueError(f"{path}:{line_number}: {exception}") from None
+            position = end
+
+    if graph is None:
+        raise ValueError(f"{path} has no problem line")
+    if source is None or target is None:
+        raise ValueError(f"{path} has no source or no target")
+    return source, target, graph
+
+
+def layout(graph: CSRGraph, source: int):
+    # DIMACS files have no coordinates: columns by hop distance from the source, unreachable nodes last
+    distance = utils.bfs_distances(graph, source)
+    columns = max(distance) + 2
+    layers = {}
+    for node, d in enumerate(distance):
+        layers.setdefault(d if d >= 0 else columns - 1, []).append(node)
+
+    for column, nodes in layers.items():
+        for row, node in enumerate(nodes):
+            graph.x[node] = (column + 0.5) / columns
+            graph.y[node] = (row + 0.5) / len(nodes)
+
+
+def write(path: str, graph, source: int, target: int):
+    base_edges = graph.get_base_edges()
+    with open(path, "w") as file:
+        file.write(f"p max {graph.number_of_nodes()} {len(base_edges)}\n"
+                   f"n {source + 1} s\n"
+                   f"n {target + 1} t\n")
+        for i in range(0, len(base_edges), CHUNK):
+            file.write("".join(f"a {edge.start + 1} {edge.end + 1} {edge.capacity}\n"
+                               for edge in base_edges[i:i + CHUNK]))
+
+
+def write_flow(path: str, graph, source: int):
+    # solution format: the flow value and the flow on every arc
+    base_edges = graph.get_base_edges()
+    with open(path, "w") as file:
+        file.write(f"s {utils.flow_value(graph, source)}\n")
+        for i in range(0, len(base_edges), CHUNK):
+            file.write("".join(f"f {edge.start + 1} {edge.end + 1} {edge.flow}\n"
+                               for edge in base_edges[i:i + CHUNK]))
+
+
+def solve_file(path: str, algorithm: str = "Dinic", flow_path: str = None) -> int:
+    # solves an instance file and returns the max-flow value, with flow_path also writes the flow
+    source, target, graph = read(path)
+    graph.reset()
+    deque(ALGORITHMS_MAP[algorithm](graph, source, target, record=False), maxlen=0)
+
+    if flow_path:
+        write_flow(flow_path, graph, source)
+    return utils.flow_value(graph, source)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="solves a DIMACS max-flow instance without the visualization")
+    parser.add_argument("path")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="Dinic", metavar="NAME")
+    parser.add_argument("--flow", metavar="PATH", help="write the flow in the DIMACS solution format")
+    args = parser.parse_args()
+
+    return solve_file(args.path, args.algorithm, args.flow)
+
+
+if __name__ == "__main__":
+    print(f"max-flow value: {main()}")
@@ -0,0 +1,112 @@
+import mmap
+import struct
+from array import array
+
+# file layout:
+#   header
+#   checkpoint 0: flows of all base edges before the first step (arcs x int64)
+#   per step: number of changed base edges (uint32), then (base edge index uint32, flow delta int64) each,
+#             after every checkpoint_interval steps another checkpoint with the flows after that step
+#   index: offset of every step (steps x uint64), offset of every checkpoint (uint64 each)
+MAGIC = b"MFTR"
+VERSION = 1
+CHECKPOINT_INTERVAL = 256
+HEADER = struct.Struct("<4sIIIIQ")
+COUNT = struct.Struct("<I")
+DELTA = struct.Struct("<Iq")
+OFFSET = struct.Struct("<Q")
+
+
+class TraceWriter:
+
+    def __init__(self, path: str, graph, checkpoint_interval: int = CHECKPOINT_INTERVAL):
+        self.base_edges = graph.get_base_edges()
+        self.arc_ids = {edge: i for i, edge in enumerate(self.base_edges)}
+        self.flows = array("q", (edge.flow for edge in self.base_edges))
+        self.checkpoint_interval = checkpoint_interval
+        self.steps = 0
+        self.step_offsets = array("Q")
+        self.checkpoint_offsets = array("Q")
+
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.base_edges), 0, checkpoint_interval, 0))
+        self.write_checkpoint()
+
+    def write_checkpoint(self):
+        self.checkpoint_offsets.append(self.file.tell())
+        self.file.write(self.flows.tobytes())
+
+    def record(self, edges):
+        # edges: the arcs (forward or reverse) whose flow the step changed
+        arcs = sorted({self.arc_ids[edge.reverse_edge if edge.reverse else edge] for edge in edges})
+
+        self.step_offsets.append(self.file.tell())
+        record = bytearray(COUNT.size + DELTA.size * len(arcs))
+        COUNT.pack_into(record, 0, len(arcs))
+        for i, arc in enumerate(arcs):
+            delta = self.base_edges[arc].flow - self.flows[arc]
+            self.flows[arc] += delta
+            DELTA.pack_into(record, COUNT.size + i * DELTA.size, arc, delta)
+        self.file.write(record)
+
+        self.steps += 1
+        if self.steps % self.checkpoint_interval == 0:
+            self.write_checkpoint()
+
+    def close(self):
+        index_offset = self.file.tell()
+        self.file.write(self.step_offsets.tobytes())
+        self.file.write(self.checkpoint_offsets.tobytes())
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.base_edges), self.steps, self.checkpoint_interval,
+                                    index_offset))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Trace:
+    # memory-mapped trace, state s is the flow after s steps
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.arcs, self.steps, self.checkpoint_interval, self.index_offset = \
+            HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a flow trace")
+
+    def step_offset(self, step: int):
+        return OFFSET.unpack_from(self.buffer, self.index_offset + OFFSET.size * (step - 1))[0]
+
+    def checkpoint_offset(self, checkpoint: int):
+        return OFFSET.unpack_from(self.buffer, self.index_offset + OFFSET.size * (self.steps + checkpoint))[0]
+
+    def delta(self, step: int) -> list[tuple[int, int]]:
+        # (base edge index, flow delta) of the step leading from state step - 1 to state step
+        offset = self.step_offset(step)
+        count, = COUNT.unpack_from(self.buffer, offset)
+        start = offset + COUNT.size
+        return list(DELTA.iter_unpack(self.buffer[start:start + count * DELTA.size]))
+
+    def flows_at(self, step: int) -> array:
+        # the closest checkpoint before step plus the deltas since then
+        checkpoint = step // self.checkpoint_interval
+        offset = self.checkpoint_offset(checkpoint)
+        flows = array("q")
+        flows.frombytes(self.buffer[offset:offset + 8 * self.arcs])
+
+        for s in range(checkpoint * self.checkpoint_interval + 1, step + 1):
+            for arc, delta in self.delta(s):
+                flows[arc] += delta
+        return flows
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
@@ -0,0 +1,73 @@
+import utils
+
+
+class FlowTracker:
+    # flow value and source side of the residual graph, kept up to date from the arcs each step changed
+    # instead of recomputed from all arcs: the source side only grows until an arc of its search tree
+    # is saturated, then it is recomputed on the next query
+
+    def __init__(self, graph, source: int):
+        self.graph = graph
+        self.source = source
+        # changes whenever the source side changes
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        # starts over from the current flows, needed after changes update did not see
+        self.flows = {edge: edge.flow for edge in self.graph.get_base_edges()}
+        self.value = utils.flow_value(self.graph, self.source)
+        self.recompute()
+
+    def recompute(self):
+        # parent[v] is the residual arc through which v was reached from the source
+        self.parent = {self.source: None}
+        self.grow(self.source)
+        self.dirty = False
+        self.version += 1
+
+    def grow(self, node: int):
+        stack = [node]
+        while stack:
+            u = stack.pop()
+            for edge in self.graph.get_edges_by_node(u):
+                if edge.end not in self.parent and edge.residual_capacity() > 0:
+                    self.parent[edge.end] = edge
+                    stack.append(edge.end)
+
+    def update(self, edges):
+        # edges: the arcs whose flow or capacity changed
+        grown = []
+        for edge in edges:
+            base_edge = edge.reverse_edge if edge.reverse else edge
+            delta = base_edge.flow - self.flows[base_edge]
+            if delta != 0:
+                self.flows[base_edge] = base_edge.flow
+                if base_edge.start == self.source:
+                    self.value += delta
+                if base_edge.end == self.source:
+                    self.value -= delta
+            if self.dirty:
+                continue
+
+            # flow and capacity changes can take residual capacity from an arc of the search tree
+            # or give it to an arc leaving the source side
+            for arc in (base_edge, base_edge.reverse_edge):
+                if arc.residual_capacity() == 0:
+                    if self.parent.get(arc.end) == arc:
+                        self.dirty = True
+                        break
+                elif arc.start in self.parent and arc.end not in self.parent:
+                    self.parent[arc.end] = arc
+                    grown.append(arc.end)
+
+        if grown and not self.dirty:
+            for node in grown:
+                self.grow(node)
+            self.version += 1
+
+    def cut(self):
+        # set-like view of the nodes reachable from the source in the residual graph
+        if self.dirty:
+            self.recompute()
+        return self.parent.keys()
@@ -0,0 +1,76 @@
+import numpy as np
+
+from csr_graph import CSRGraph, CSRArc
+
+
+class ArcParents:
+    # parent[v] of the scalar searches, the CSRArc views are only created when indexed
+    __slots__ = ("graph", "arcs")
+
+    def __init__(self, graph: CSRGraph, arcs: np.ndarray):
+        self.graph = graph
+        self.arcs = arcs
+
+    def __getitem__(self, node: int):
+        arc = self.arcs[node]
+        return CSRArc(self.graph, int(arc)) if arc >= 0 else None
+
+    def __len__(self):
+        return len(self.arcs)
+
+
+def residual_capacities(graph: CSRGraph) -> np.ndarray:
+    capacity = np.frombuffer(graph.capacity, dtype=np.int64)
+    flow = np.frombuffer(graph.flow, dtype=np.int64)
+    pair = np.frombuffer(graph.pair, dtype=np.int32)
+    is_reverse = np.frombuffer(graph.is_reverse, dtype=np.int8).astype(bool)
+    return np.where(is_reverse, flow[pair], capacity - flow)
+
+
+def bfs_capacity(graph: CSRGraph, source: int, target: int, delta: int, stats=None):
+    # expands a whole level per iteration with gathers over the csr arrays, same result contract
+    # as max_flow.bfs_capacity except that the level of the target is completed before returning
+    if stats is not None:
+        stats.searches += 1
+
+    graph.ensure_built()
+    offsets = np.frombuffer(graph.offsets, dtype=np.int32)
+    head = np.frombuffer(graph.head, dtype=np.int32)
+    admissible = residual_capacities(graph) >= delta
+
+    n = graph.number_of_nodes()
+    parent = np.full(n, -1, dtype=np.int64)
+    level = np.full(n, -1, dtype=np.int64)
+    level[source] = 0
+    frontier = np.array([source])
+
+    depth = 0
+    while frontier.size and level[target] < 0:
+        # arc positions offsets[u] .. offsets[u + 1] of all frontier nodes u, concatenated
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        total = int(counts.sum())
+        if stats is not None:
+            stats.arcs_scanned += total
+        if total == 0:
+            break
+        arcs = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+
+        arcs = arcs[admissible[arcs]]
+        ends = head[arcs]
+        unvisited = level[ends] < 0
+        arcs, ends = arcs[unvisited], ends[unvisited]
+
+        # the first arc into a node becomes its parent, like in the scalar search
+        frontier, first = np.unique(ends, return_index=True)
+        depth += 1
+        level[frontier] = depth
+        parent[frontier] = arcs[first]
+
+    if level[target] < 0:
+        return None
+    return ArcParents(graph, parent), level.tolist()
+
+
+def bfs(graph: CSRGraph, source: int, target: int, stats=None):
+    return bfs_capacity(graph, source, target, 1, stats)
@@ -1,4 +1,5 @@
 import math
+from contextlib import nullcontext
 
 
 class Node:
@@ -46,6 +47,7 @@ class Graph:
                            (i // rows) / rows + padding)
                       for i in range(n)]
         self.edges = [[] for _ in range(n)]
+        self.edge_index = {}
         self.n = n
 
     def add_edge(self, start: int, end: int, capacity: int):
@@ -58,9 +60,17 @@ class Graph:
         self.edges[start].append(edge)
         self.edges[end].append(rev_edge)
 
+        self.edge_index.setdefault((start, end), []).append(edge)
+        self.edge_index.setdefault((end, start), []).append(rev_edge)
+        return edge
+
     def get_edges_by_node(self, node: int):
         return self.edges[node]
 
+    def cached_arcs(self):
+        # the Edge objects are kept anyway, see CSRGraph.cached_arcs
+        return nullcontext()
+
     def get_degree(self, node: int):
         return len(self.edges[node])
 
@@ -72,11 +82,14 @@ class Graph:
     def get_base_edges(self):
         return list(filter(lambda x: not x.reverse, self.get_edges()))
 
+    def get_edges_between(self, start: int, end: int):
+        return self.edge_index.get((start, end), [])
+
     def has_edge(self, start: int, end: int):
-        for edge in self.get_edges_by_node(start):
-            if edge.start == start and edge.end == end:
-                return True
-        return False
+        return (start, end) in self.edge_index
+
+    def get_pairs(self):
+        return [(start, end) for start, end in self.edge_index if start < end]
 
     def get_nodes(self):
         return self.nodes
@@ -95,8 +108,10 @@ class Graph:
             edge.flow = 0
             edge.prev_flow = edge.residual_capacity()
 
-    def copy(self):
+    def copy(self, with_flow: bool = False):
         graph_copy = Graph(self.n)
         for edge in self.get_base_edges():
-            graph_copy.add_edge(edge.start, edge.end, edge.capacity)
+            edge_copy = graph_copy.add_edge(edge.start, edge.end, edge.capacity)
+            if with_flow:
+                edge_copy.flow = edge.flow
         return graph_copy
@@ -0,0 +1,143 @@
+import math
+
+
+class LinkCutTree:
+    # rooted forest on the nodes 0 .. n - 1 with a value on every node (the arc to its parent),
+    # paths to the roots are kept in splay trees ordered from the root downwards, so every operation
+    # is amortized O(log n); parent[x] is the splay parent or, at the root of a splay tree, the path parent
+
+    def __init__(self, n: int):
+        self.left = [-1] * n
+        self.right = [-1] * n
+        self.parent = [-1] * n
+        self.value = [math.inf] * n
+        # minimum value in the splay subtree and a pending addition for the children
+        self.minimum = [math.inf] * n
+        self.lazy = [0] * n
+
+    def is_splay_root(self, x: int):
+        p = self.parent[x]
+        return p == -1 or (self.left[p] != x and self.right[p] != x)
+
+    def apply(self, x: int, delta):
+        if x != -1:
+            self.value[x] += delta
+            self.minimum[x] += delta
+            self.lazy[x] += delta
+
+    def push(self, x: int):
+        if self.lazy[x]:
+            self.apply(self.left[x], self.lazy[x])
+            self.apply(self.right[x], self.lazy[x])
+            self.lazy[x] = 0
+
+    def update(self, x: int):
+        minimum = self.value[x]
+        if self.left[x] != -1 and self.minimum[self.left[x]] < minimum:
+            minimum = self.minimum[self.left[x]]
+        if self.right[x] != -1 and self.minimum[self.right[x]] < minimum:
+            minimum = self.minimum[self.right[x]]
+        self.minimum[x] = minimum
+
+    def rotate(self, x: int):
+        p = self.parent[x]
+        g = self.parent[p]
+        if not self.is_splay_root(p):
+            if self.left[g] == p:
+                self.left[g] = x
+            else:
+                self.right[g] = x
+        self.parent[x] = g
+
+        if self.left[p] == x:
+            self.left[p] = self.right[x]
+            if self.right[x] != -1:
+                self.parent[self.right[x]] = p
+            self.right[x] = p
+        else:
+            self.right[p] = self.left[x]
+            if self.left[x] != -1:
+                self.parent[self.left[x]] = p
+            self.left[x] = p
+        self.parent[p] = x
+        self.update(p)
+        self.update(x)
+
+    def splay(self, x: int):
+        # pending additions are pushed from the top of the splay tree down to x first
+        ancestors = [x]
+        while not self.is_splay_root(ancestors[-1]):
+            ancestors.append(self.parent[ancestors[-1]])
+        for y in reversed(ancestors):
+            self.push(y)
+
+        while not self.is_splay_root(x):
+            p = self.parent[x]
+            if not self.is_splay_root(p):
+                g = self.parent[p]
+                if (self.left[g] == p) == (self.left[p] == x):
+                    self.rotate(p)
+                else:
+                    self.rotate(x)
+            self.rotate(x)
+
+    def access(self, v: int):
+        # makes the path from the root to v one splay tree with v at its top and nothing below v
+        last = -1
+        u = v
+        while u != -1:
+            self.splay(u)
+            self.right[u] = last
+            self.update(u)
+            last = u
+            u = self.parent[u]
+        self.splay(v)
+
+    def find_root(self, v: int) -> int:
+        self.access(v)
+        u = v
+        while True:
+            self.push(u)
+            if self.left[u] == -1:
+                break
+            u = self.left[u]
+        self.splay(u)
+        return u
+
+    def path_min(self, v: int):
+        # the node with the smallest value on the path from v to its root, the one closest to the root on ties
+        self.access(v)
+        minimum = self.minimum[v]
+        u = v
+        while True:
+            self.push(u)
+            if self.left[u] != -1 and self.minimum[self.left[u]] == minimum:
+                u = self.left[u]
+            elif self.value[u] == minimum:
+                break
+            else:
+                u = self.right[u]
+        self.splay(u)
+        return u, minimum
+
+    def path_add(self, v: int, delta):
+        self.access(v)
+        self.apply(v, delta)
+
+    def link(self, v: int, w: int, value):
+        # v must be a root, w becomes its parent and value the value of v
+        self.access(v)
+        self.parent[v] = w
+        self.value[v] = value
+        self.update(v)
+
+    def cut(self, v: int):
+        # separates v from its parent and returns the value of v
+        self.access(v)
+        if self.left[v] != -1:
+            self.parent[self.left[v]] = -1
+            self.left[v] = -1
+        value = self.value[v]
+        self.value[v] = math.inf
+        self.update(v)
+        return value
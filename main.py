@@ -1,32 +1,33 @@
-import math
-import random
+import json
+import os
+import tempfile
+import time
 import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
+from tkinter import filedialog
 from tkinter import messagebox
 from tkinter import ttk
 
-from tabulate import tabulate
-
+import dimacs
+import flow_trace
 import max_flow
 import random_graph
 import utils
-
-ALGORITHMS_MAP = {"Ford-Fulkerson": max_flow.ford_fulkerson,
-                  "Edmonds-Karp": max_flow.edmonds_karp,
-                  "Capacity Scaling": max_flow.capacity_scaling,
-                  "Dinic": max_flow.dinic,
-                  "Goldberg-Tarjan": max_flow.goldberg_tarjan
-                  }
-ALGORITHMS = list(ALGORITHMS_MAP.keys())
+import verification
+import widgets
+from algorithms import ALGORITHMS, changed_edges
+from flow_tracker import FlowTracker
+from renderer import GraphRenderer
+from step_worker import StepWorker
 
 
 class Visualization(tk.Frame):
     DEFAULT_NODES = 16
     DEFAULT_MAX_CAPACITY = 10
-    NODE_RADIUS = 20
-    TEXT_OFFSET = 25
-    ANGLE = 10
-    CUT_OFFSET = 20
-    CUT_LENGTH = 10
+    MAX_LOAD_NODES = 100000
+    ZOOM_STEP = 1.25
+    # how often a step waits for the worker to produce it
+    POLL_INTERVAL = 20
 
     def __init__(self, parent):
         super().__init__(parent)
@@ -39,7 +40,8 @@ class Visualization(tk.Frame):
         self.opt_algorithm = tk.OptionMenu(config_bar, self.algo_variable, *ALGORITHMS)
         self.opt_algorithm.config(width=20)
         self.opt_algorithm.grid(row=0, column=0, padx=10)
-        self.max_flow_algo = None
+        # computes the steps of the running algorithm ahead of the drawing
+        self.worker = None
 
         lbl_nodes = tk.Label(master=config_bar, text="Nodes:")
         lbl_nodes.grid(row=0, column=1)
@@ -61,241 +63,216 @@ class Visualization(tk.Frame):
         self.btn_reset = tk.Button(text="generate", master=config_bar, command=self.generate)
         self.btn_reset.grid(row=0, column=6, padx=10)
 
+        self.btn_load = tk.Button(text="load", master=config_bar, command=self.load)
+        self.btn_load.grid(row=0, column=7, padx=10)
+
         self.btn_step = tk.Button(text="step", master=config_bar, command=self.step)
-        self.btn_step.grid(row=0, column=7, padx=10)
+        self.btn_step.grid(row=0, column=8, padx=10)
 
-        self.ent_time = utils.EntryWithPlaceholder(master=config_bar, placeholder="interval in ms")
-        self.ent_time.grid(row=0, column=8, padx=10)
+        self.ent_time = widgets.EntryWithPlaceholder(master=config_bar, placeholder="interval in ms")
+        self.ent_time.grid(row=0, column=9, padx=10)
 
         self.btn_start = tk.Button(text="start", master=config_bar, command=self.start)
-        self.btn_start.grid(row=0, column=9, padx=10)
+        self.btn_start.grid(row=0, column=10, padx=10)
 
         self.btn_stop = tk.Button(text="stop", master=config_bar, command=self.stop)
-        self.btn_stop.grid(row=0, column=10, padx=10)
+        self.btn_stop.grid(row=0, column=11, padx=10)
 
         self.btn_help = tk.Button(text="help", master=config_bar, command=self.help)
-        self.btn_help.grid(row=0, column=11, padx=11)
+        self.btn_help.grid(row=0, column=12, padx=11)
 
         config_bar.pack(anchor=tk.N)
 
+        replay_bar = tk.Frame(self)
+
+        self.btn_record = tk.Button(text="record", master=replay_bar, command=self.record)
+        self.btn_record.grid(row=0, column=0, padx=10)
+
+        self.btn_back = tk.Button(text="back", master=replay_bar, command=self.back, state=tk.DISABLED)
+        self.btn_back.grid(row=0, column=1, padx=10)
+
+        self.scale_trace = tk.Scale(master=replay_bar, orient=tk.HORIZONTAL, from_=0, to=0, length=600,
+                                    command=self.seek, state=tk.DISABLED)
+        self.scale_trace.grid(row=0, column=2, padx=10)
+
+        replay_bar.pack(anchor=tk.N)
+
         self.canvas = tk.Canvas(self, bg="white")
         self.canvas.pack(anchor=tk.CENTER, expand=True, fill="both")
+        self.canvas.bind("<Configure>", self.redraw)
+        # mouse wheel zooms around the pointer, dragging pans and a double click shows the whole graph
+        self.canvas.bind("<MouseWheel>", lambda event: self.zoom(event, event.delta > 0))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(event, True))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(event, False))
+        self.canvas.bind("<ButtonPress-1>", self.drag_start)
+        self.canvas.bind("<B1-Motion>", self.drag)
+        self.canvas.bind("<Double-Button-1>", lambda event: self.renderer.reset_view())
+        self.drag_position = None
+        self.renderer = GraphRenderer(self.canvas)
+        self.last_result = None
+        self.changed_edges = []
+        self.changed_pairs = set()
+        # flow value and cut of the running algorithm, None before its first step
+        self.tracker = None
+        self.cut_version = None
+
+        # recorded run, replayed from the trace file instead of the algorithm
+        self.trace = None
+        self.trace_path = None
+        self.trace_step = 0
 
         self._jop = None
+        # when the next frame of start is due, in seconds of time.perf_counter
+        self._due = 0
+        self.interval = 0
 
         self.source, self.target, self.graph = random_graph.generate(self.DEFAULT_NODES, self.DEFAULT_MAX_CAPACITY)
         self.graph.reset()
+        self.renderer.build(self.graph, self.source, self.target)
 
-        self.after(100, self.render)
-
-    def clear_canvas(self):
-        width = self.master.winfo_screenwidth()
-        height = self.master.winfo_screenheight()
-
-        self.canvas.create_rectangle(0, 0, width, height, fill="white")
+        self.after(100, self.redraw)
 
     def render(self):
-        self.clear_canvas()
-        self.render_nodes()
+        self.last_result = None
+        self.renderer.clear_overlays()
 
-        for edge in self.graph.get_base_edges():
-            self.render_edge(edge.start, edge.end, "black")
+        for start, end in self.graph.get_pairs():
+            self.renderer.render_pair(start, end, "black", "black")
 
-    def render_nodes(self):
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
+    def redraw(self, event=None):
+        self.renderer.layout()
+        if self.trace is not None:
+            self.render_trace()
+        elif self.last_result is None:
+            self.render()
+        else:
+            self.render_step(self.last_result)
+
+    def zoom(self, event, zoom_in: bool):
+        self.renderer.zoom_at(event.x, event.y, self.ZOOM_STEP if zoom_in else 1 / self.ZOOM_STEP)
+
+    def drag_start(self, event):
+        self.drag_position = (event.x, event.y)
+
+    def drag(self, event):
+        x, y = self.drag_position
+        self.renderer.pan(event.x - x, event.y - y)
+        self.drag_position = (event.x, event.y)
+
+    def render_dinic(self, edges, level, pairs, nodes):
+        for node_id in nodes:
+            self.renderer.node_text(node_id, f"{level[node_id]}" if level[node_id] >= 0 else None)
+
+        touched = utils.edge_pairs(edges)
+        for start, end in pairs:
+            color_forward = "light grey"
+            color_reverse = "light grey"
+            if level[start] + 1 == level[end] and level[start] != -1:
+                color_forward = "black"
+            if level[end] + 1 == level[start] and level[end] != -1:
+                color_reverse = "black"
+            if (start, end) in touched:
+                color_forward = "red"
+                color_reverse = "red"
+            self.renderer.render_pair(start, end, color_forward, color_reverse)
+
+    def render_goldberg_tarjan(self, edges, excess, label, node_id, relabeled, pairs, nodes):
+        for node in nodes:
+            self.renderer.node_text(node, f"{label[node]} | {excess[node]}")
+        self.renderer.highlight(node_id)
+
+        touched = utils.edge_pairs(edges)
+        for start, end in pairs:
+            color = "red" if (start, end) in touched else "black"
+            self.renderer.render_pair(start, end, color, color)
 
-        for node in self.graph.get_nodes():
-            absolute_x, absolute_y = utils.absolute_position(node, width, height)
+        self.render_saturated_cut()
 
-            if node.node_id == self.source:
-                color = "blue"
-            elif node.node_id == self.target:
-                color = "purple"
+    def render_boykov_kolmogorov(self, edges, tree, parent, changed, pairs, nodes):
+        for node in nodes:
+            self.renderer.node_text(node, {max_flow.SOURCE_TREE: "S", max_flow.TARGET_TREE: "T"}.get(tree[node]))
+
+        def color(start, end):
+            # arcs of the source tree point away from the source, arcs of the target tree towards the target
+            if tree[end] == max_flow.SOURCE_TREE and parent[end] is not None and parent[end].start == start:
+                return "blue"
+            if tree[start] == max_flow.TARGET_TREE and parent[start] is not None and parent[start].end == end:
+                return "purple"
+            return "black"
+
+        touched = utils.edge_pairs(edges)
+        for start, end in pairs:
+            if (start, end) in touched:
+                self.renderer.render_pair(start, end, "red", "red")
             else:
-                color = "black"
-
-            self.canvas.create_oval(absolute_x - self.NODE_RADIUS, absolute_y - self.NODE_RADIUS,
-                                    absolute_x + self.NODE_RADIUS, absolute_y + self.NODE_RADIUS,
-                                    fill=color)
-
-    def render_single_edge(self, start: int, end: int, residual_capacity: int, prev_residual_capacity: int, color: str):
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-
-        x1, y1, x2, y2 = utils.edge_positions(
-            utils.Point(*utils.absolute_position(self.graph.get_node(start), width, height)),
-            utils.Point(*utils.absolute_position(self.graph.get_node(end), width, height)),
-            self.NODE_RADIUS)
-
-        self.canvas.create_line(x1, y1,
-                                x2, y2,
-                                width=3, fill=color, arrow=tk.LAST, arrowshape=(10, 15, 5))
-
-        p1 = utils.Point(x1, y1)
-        p2 = utils.Point(x2, y2)
-        self.canvas.create_text(*utils.text_position(p1, p2, self.TEXT_OFFSET),
-                                text=utils.edge_text(residual_capacity, prev_residual_capacity))
-
-    def render_double_edge(self, start: int, end: int, residual_capacity: int, prev_residual_capacity: int, color: str):
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-
-        node1 = utils.Point(*utils.absolute_position(self.graph.get_node(start), width, height))
-        node2 = utils.Point(*utils.absolute_position(self.graph.get_node(end), width, height))
-
-        x1, y1, x2, y2 = utils.edge_positions(node1,
-                                              node2,
-                                              self.NODE_RADIUS)
-
-        p1 = utils.Point(*utils.rotate(node1, utils.Point(x1, y1), math.radians(self.ANGLE)))
-        p2 = utils.Point(*utils.rotate(node2, utils.Point(x2, y2), math.radians(-self.ANGLE)))
-
-        self.canvas.create_line(p1.x, p1.y,
-                                p2.x, p2.y,
-                                width=3, fill=color, arrow=tk.LAST, arrowshape=(10, 15, 5))
-        self.canvas.create_text(*utils.text_position(p1, p2, self.TEXT_OFFSET),
-                                text=utils.edge_text(residual_capacity, prev_residual_capacity))
-
-    def render_edge(self, start: int, end: int, color: str = None, color_forward=None, color_reverse=None):
-        residual_capacity, prev_residual_capacity = utils.aggregated_edge_values(self.graph, start, end)
-        residual_capacity_reverse, prev_residual_capacity_reverse = utils.aggregated_edge_values(self.graph, end, start)
-
-        color = color or "black"
-        color_forward = color_forward or color
-        color_reverse = color_reverse or color
-
-        if residual_capacity > 0 and residual_capacity_reverse > 0:
-            self.render_double_edge(start, end, residual_capacity, prev_residual_capacity, color_forward)
-            self.render_double_edge(end, start, residual_capacity_reverse, prev_residual_capacity_reverse, color_reverse)
-        elif residual_capacity > 0:
-            self.render_single_edge(start, end, residual_capacity, prev_residual_capacity, color_forward)
-        elif residual_capacity_reverse > 0:
-            self.render_single_edge(end, start, residual_capacity_reverse, prev_residual_capacity_reverse, color_reverse)
-
-    def render_dinic(self, edges, level):
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-
-        for node in self.graph.get_nodes():
-            position = utils.absolute_position(node, width, height)
-            if level[node.node_id] >= 0:
-                self.canvas.create_text(*position,
-                                        text=f"{level[node.node_id]}",
-                                        fill="white",
-                                        font=("Helvetica", "10", "bold"))
-
-        n = self.graph.number_of_nodes()
-        for start in range(n):
-            for end in range(start + 1, n):
-                if self.graph.has_edge(start, end):
-                    color_forward = "light grey"
-                    color_reverse = "light grey"
-                    if level[start] + 1 == level[end] and level[start] != -1:
-                        color_forward = "black"
-                    if level[end] + 1 == level[start] and level[end] != -1:
-                        color_reverse = "black"
-                    if utils.contains_edge(edges, start, end) or utils.contains_edge(edges, end, start):
-                        color_forward = "red"
-                        color_reverse = "red"
-                    self.render_edge(start, end, color_forward=color_forward, color_reverse=color_reverse)
-
-    def render_goldberg_tarjan(self, edges, excess, label, node_id):
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-
-        for node in self.graph.get_nodes():
-            position = utils.absolute_position(node, width, height)
-            self.canvas.create_text(*position,
-                                    text=f"{label[node.node_id]} | {excess[node.node_id]}",
-                                    fill="white",
-                                    font=("Helvetica", "10", "bold"))
-
-        absolute_x, absolute_y = utils.absolute_position(self.graph.get_node(node_id), width, height)
-        self.canvas.create_oval(absolute_x - self.NODE_RADIUS, absolute_y - self.NODE_RADIUS,
-                                absolute_x + self.NODE_RADIUS, absolute_y + self.NODE_RADIUS,
-                                outline="red", width=3)
-
-        n = self.graph.number_of_nodes()
-        for start in range(n):
-            for end in range(start + 1, n):
-                if self.graph.has_edge(start, end):
-                    color = "red" if utils.contains_edge(edges, start, end) or utils.contains_edge(edges, end, start) else "black"
-                    self.render_edge(start, end, color)
-
-        self.render_saturated_cut()
+                self.renderer.render_pair(start, end, color(start, end), color(end, start))
 
     def render_saturated_cut(self):
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-
-        cut = utils.saturated_cut(self.graph, self.source)
-        for edge in self.graph.get_base_edges():
-            if edge.start in cut and edge.end not in cut:
-                node1 = utils.Point(*utils.absolute_position(self.graph.get_node(edge.start), width, height))
-                node2 = utils.Point(*utils.absolute_position(self.graph.get_node(edge.end), width, height))
-
-                x, y, _, _ = utils.edge_positions(node1,
-                                                  node2,
-                                                  self.NODE_RADIUS)
-
-                dx, dy = node2.x - node1.x, node2.y - node1.y
-                length = (dx ** 2 + dy ** 2) ** 0.5
-
-                dx_norm = dx / length
-                dy_norm = dy / length
-
-                x, y = x + self.CUT_OFFSET * dx_norm, y + self.CUT_OFFSET * dy_norm
-                orthogonal_x, orthogonal_y = -dy_norm * self.CUT_LENGTH, dx_norm * self.CUT_LENGTH
-
-                x1, y1 = x + orthogonal_x, y + orthogonal_y
-                x2, y2 = x - orthogonal_x, y - orthogonal_y
-
-                self.canvas.create_line(x1, y1, x2, y2, width=3, fill="blue")
-
-    def render_ford_fulkerson(self, edges):
-        n = self.graph.number_of_nodes()
-        for start in range(n):
-            for end in range(start + 1, n):
-                if self.graph.has_edge(start, end):
-                    color = "red" if utils.contains_edge(edges, start, end) or utils.contains_edge(edges, end, start) else "black"
-                    self.render_edge(start, end, color)
-
-    def render_step(self, result):
-        self.render()
-
+        # the cut markers only change with the source side
+        cut = self.tracker.cut()
+        if self.tracker.version != self.cut_version:
+            self.renderer.render_cut(cut)
+            self.cut_version = self.tracker.version
+
+    def render_ford_fulkerson(self, edges, pairs):
+        touched = utils.edge_pairs(edges)
+        for start, end in pairs:
+            color = "red" if (start, end) in touched else "black"
+            self.renderer.render_pair(start, end, color, color)
+
+    def step_delta(self, result):
+        # arcs whose flow the step changed, nodes whose text changed (None if all nodes may have changed)
+        # and the pairs to redraw
+        edges = changed_edges(self.algo_variable.get(), result)
+        pairs = utils.edge_pairs(edges)
         match self.algo_variable.get():
-            case "Dinic":
-                self.render_dinic(*result)
-            case "Goldberg-Tarjan":
-                self.render_goldberg_tarjan(*result)
+            case "Dinic" | "Dinic (dynamic trees)":
+                return edges, None, pairs
+            case "Goldberg-Tarjan" | "Goldberg-Tarjan (highest label)":
+                _, _, _, node_id, relabeled = result
+                if relabeled is None:
+                    return edges, None, pairs
+                return (edges, relabeled | {node_id} | {edge.start for edge in edges} | {edge.end for edge in edges},
+                        pairs)
+            case "Boykov-Kolmogorov":
+                # tree arcs around nodes that joined, left or changed their tree are recoloured
+                changed = result[3]
+                pairs |= {(min(node, edge.end), max(node, edge.end))
+                          for node in changed for edge in self.graph.get_edges_by_node(node) if edge.end != node}
+                return edges, changed, pairs
             case _:
-                self.render_ford_fulkerson(result)
+                return edges, set(), pairs
 
-    def render_result(self):
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
+    def render_step(self, result, pairs=None, nodes=None):
+        # pairs and nodes limit the redraw to what changed, without them everything is redrawn
+        self.last_result = result
+        if pairs is None or nodes is None:
+            self.renderer.clear_overlays()
+            self.cut_version = None
+            pairs = self.graph.get_pairs()
+            nodes = range(self.graph.number_of_nodes())
 
-        self.clear_canvas()
-        self.render_nodes()
-
-        for edge in self.graph.get_base_edges():
-            node1 = utils.Point(*utils.absolute_position(self.graph.get_node(edge.start), width, height))
-            node2 = utils.Point(*utils.absolute_position(self.graph.get_node(edge.end), width, height))
-
-            x1, y1, x2, y2 = utils.edge_positions(node1,
-                                                  node2,
-                                                  self.NODE_RADIUS)
+        match self.algo_variable.get():
+            case "Dinic" | "Dinic (dynamic trees)":
+                self.render_dinic(*result, pairs, nodes)
+            case "Goldberg-Tarjan" | "Goldberg-Tarjan (highest label)":
+                self.render_goldberg_tarjan(*result, pairs, nodes)
+            case "Boykov-Kolmogorov":
+                self.render_boykov_kolmogorov(*result, pairs, nodes)
+            case _:
+                self.render_ford_fulkerson(result, pairs)
 
-            self.canvas.create_line(x1, y1, x2, y2, width=3, fill="black", arrow=tk.LAST, arrowshape=(10, 15, 5))
+    def render_trace(self, pairs=None):
+        # the trace only holds flows, so replayed steps are drawn like augmenting paths
+        if pairs is None:
+            self.renderer.clear_overlays()
+            pairs = self.graph.get_pairs()
+        self.render_ford_fulkerson(self.changed_edges, pairs)
 
-            text_x, text_y = utils.text_position(utils.Point(x1, y1), utils.Point(x2, y2), 0)
-            offset = 20
-            self.canvas.create_rectangle(text_x - offset, text_y - offset,
-                                         text_x + offset, text_y + offset,
-                                         fill="white", outline="")
-            self.canvas.create_text(text_x, text_y,
-                                    text=f"{edge.flow}/{edge.capacity}")
+    def render_result(self):
+        self.renderer.clear_overlays()
+        for start, end in self.graph.get_pairs():
+            self.renderer.render_result_pair(start, end)
 
     def algorithm_terminated(self):
         self.btn_stop["state"] = tk.DISABLED
@@ -307,20 +284,27 @@ class Visualization(tk.Frame):
             window.after_cancel(self._jop)
             self._jop = None
 
-        messagebox.showinfo("Info", f"algorithm terminated!\nmax-flow value: {utils.flow_value(self.graph, self.source)}")
+        messagebox.showinfo("Info", f"algorithm terminated!\nmax-flow value: {self.tracker.value}")
 
     def reset(self):
         if self._jop is not None:
             window.after_cancel(self._jop)
             self._jop = None
+        if self.worker is not None:
+            self.worker.close()
 
         self.graph.reset()
         self.graph.reset()
 
-        self.max_flow_algo = None
+        self.worker = None
+        self.changed_edges = []
+        self.changed_pairs = set()
+        self.tracker = None
+        self.close_trace()
         self.render()
 
         self.opt_algorithm["state"] = tk.NORMAL
+        self.btn_record["state"] = tk.NORMAL
         self.btn_step["state"] = tk.NORMAL
         self.btn_start["state"] = tk.NORMAL
         self.btn_stop["state"] = tk.NORMAL
@@ -332,42 +316,247 @@ class Visualization(tk.Frame):
         try:
             n = int(self.ent_nodes.get())
             capacity = int(self.ent_capacity.get())
-
-            self.source, self.target, self.graph = random_graph.generate(n, capacity)
-            self.graph.reset()
-            self.render()
-
-            self.max_flow_algo = None
         except ValueError:
             messagebox.showerror("Error", "nodes and capacity must be integers")
+            return
 
-    def step(self):
-        for edge in self.graph.get_edges():
-            edge.prev_flow = edge.residual_capacity()
+        try:
+            source, target, graph = random_graph.generate(n, capacity)
+        except ValueError as exception:
+            messagebox.showerror("Error", f"cannot generate a graph:\n{exception}")
+            return
 
-        if self.max_flow_algo is None:
-            self.max_flow_algo = ALGORITHMS_MAP[self.algo_variable.get()](self.graph, self.source, self.target)
-            self.opt_algorithm["state"] = tk.DISABLED
+        self.source, self.target, self.graph = source, target, graph
+        self.graph.reset()
+        self.renderer.build(self.graph, self.source, self.target)
+        self.render()
+
+    def load(self):
+        path = filedialog.askopenfilename(filetypes=[("DIMACS max-flow", "*.max *.dimacs"), ("all files", "*")])
+        if not path:
+            return
 
         try:
-            result = next(self.max_flow_algo)
-            self.render_step(result)
-        except StopIteration:
+            source, target, graph = dimacs.read(path)
+        except (OSError, ValueError) as exception:
+            messagebox.showerror("Error", f"cannot read {path}:\n{exception}")
+            return
+        if graph.number_of_nodes() > self.MAX_LOAD_NODES:
+            messagebox.showerror("Error", f"{graph.number_of_nodes()} nodes are too many to draw, "
+                                          f"solve the instance with dimacs.py instead")
+            return
+
+        self.reset()
+        dimacs.layout(graph, source)
+        self.source, self.target, self.graph = source, target, graph
+        self.graph.reset()
+        self.renderer.build(self.graph, self.source, self.target)
+        self.render()
+
+    def step(self):
+        if self.trace is not None:
+            if self.trace_step == self.trace.steps:
+                self.algorithm_terminated()
+            else:
+                self.seek(self.trace_step + 1)
+            return
+
+        if self._jop is not None:
+            window.after_cancel(self._jop)
+            self._jop = None
+        self.start_worker()
+
+        frame = self.worker.get(block=False)
+        if frame is not None:
+            self.advance([frame])
+        elif self.worker.done:
             self.algorithm_terminated()
+        else:
+            # the worker is still computing the step
+            self._jop = window.after(self.POLL_INTERVAL, self.step)
+
+    def start_worker(self):
+        if self.worker is not None:
+            return
+        self.worker = StepWorker(self.algo_variable.get(), self.graph, self.source, self.target)
+        self.tracker = FlowTracker(self.graph, self.source)
+        self.opt_algorithm["state"] = tk.DISABLED
+        self.btn_record["state"] = tk.DISABLED
+
+    def advance(self, frames):
+        # applies the flows of the frames in order and draws the last one,
+        # together with the pairs every frame before it changed
+        nodes, pairs = set(), set()
+        for frame in frames:
+            # only the arcs of the previous step can have a stale prev_flow
+            for edge in self.changed_edges:
+                edge.prev_flow = edge.residual_capacity()
+                edge.reverse_edge.prev_flow = edge.reverse_edge.residual_capacity()
+            for edge, flow in frame.flows:
+                edge.flow = flow
+
+            edges, step_nodes, step_pairs = self.step_delta(frame.result)
+            self.tracker.update(edges)
+            nodes = None if nodes is None or step_nodes is None else nodes | step_nodes
+            # the pairs of the previous step lose their highlight and previous residual capacity
+            pairs |= step_pairs | self.changed_pairs
+            self.changed_edges = edges
+            self.changed_pairs = step_pairs
+
+        if self.last_result is None:
+            self.render_step(frames[-1].result)
+        else:
+            self.render_step(frames[-1].result, pairs, nodes)
+
+    def record(self):
+        # runs the whole algorithm into a trace file on the worker thread, afterwards step, back and the slider
+        # replay it
+        self.reset()
+
+        descriptor, path = tempfile.mkstemp(suffix=".trace")
+        os.close(descriptor)
+        self.trace_path = path
+        self.worker = StepWorker(self.algo_variable.get(), self.graph, self.source, self.target, trace_path=path)
+
+        self.opt_algorithm["state"] = tk.DISABLED
+        self.btn_record["state"] = tk.DISABLED
+        self.btn_step["state"] = tk.DISABLED
+        self.btn_start["state"] = tk.DISABLED
+        self.poll_record()
+
+    def poll_record(self):
+        self._jop = None
+        self.worker.get(block=False)
+        if not self.worker.done:
+            self._jop = window.after(self.POLL_INTERVAL, self.poll_record)
+            return
+
+        self.worker = None
+        self.tracker = FlowTracker(self.graph, self.source)
+        self.trace = flow_trace.Trace(self.trace_path)
+        self.trace_step = 0
+
+        self.btn_step["state"] = tk.NORMAL
+        self.btn_start["state"] = tk.NORMAL
+        self.btn_back["state"] = tk.NORMAL
+        self.scale_trace.config(to=self.trace.steps, state=tk.NORMAL)
+        self.scale_trace.set(0)
+        self.render_trace()
+
+    def seek(self, step):
+        # neighbouring steps apply one delta, jumps start from the closest checkpoint
+        if self.trace is None:
+            return
+        step = min(max(int(step), 0), self.trace.steps)
+        if step == self.trace_step:
+            return
+
+        base_edges = self.graph.get_base_edges()
+        # the changes of the step that is drawn afterwards
+        deltas = self.trace.delta(step) if step > 0 else []
+        if step == self.trace_step + 1:
+            for arc, delta in deltas:
+                base_edges[arc].flow += delta
+            self.tracker.update([base_edges[arc] for arc, _ in deltas])
+        elif step == self.trace_step - 1:
+            undone = self.trace.delta(self.trace_step)
+            for arc, delta in undone:
+                base_edges[arc].flow -= delta
+            self.tracker.update([base_edges[arc] for arc, _ in undone])
+        else:
+            for edge, flow in zip(base_edges, self.trace.flows_at(step)):
+                edge.flow = flow
+            self.tracker.reset()
+        jump = abs(step - self.trace_step) > 1
+        self.trace_step = step
+
+        for edge in base_edges if jump else self.changed_edges:
+            edge.prev_flow = edge.residual_capacity()
+            edge.reverse_edge.prev_flow = edge.reverse_edge.residual_capacity()
+
+        # previous residual capacities from the flows before the step
+        edges = []
+        for arc, delta in deltas:
+            edge = base_edges[arc]
+            edge.prev_flow = edge.capacity - (edge.flow - delta)
+            edge.reverse_edge.prev_flow = edge.flow - delta
+            edges.append(edge)
+
+        pairs = utils.edge_pairs(edges)
+        previous_pairs = self.changed_pairs
+        self.changed_edges = edges
+        self.changed_pairs = pairs
+        self.scale_trace.set(step)
+        self.render_trace(None if jump else pairs | previous_pairs)
+
+    def back(self):
+        if self.trace is not None:
+            self.seek(self.trace_step - 1)
+
+    def close_trace(self):
+        # also removes the file of a recording that reset cancelled
+        if self.trace_path is None:
+            return
+        if self.trace is not None:
+            self.trace.close()
+        os.remove(self.trace_path)
+        self.trace = None
+        self.trace_path = None
+        self.trace_step = 0
+        self.btn_back["state"] = tk.DISABLED
+        self.scale_trace.set(0)
+        self.scale_trace.config(to=0, state=tk.DISABLED)
 
     def start(self):
         try:
             interval = int(self.ent_time.get())
+        except ValueError:
+            messagebox.showerror("Error", "interval must be an integer")
+            return
 
-            self.opt_algorithm["state"] = tk.DISABLED
-            self.btn_step["state"] = tk.DISABLED
-            self.btn_start["state"] = tk.DISABLED
-            self.ent_time["state"] = tk.DISABLED
+        self.opt_algorithm["state"] = tk.DISABLED
+        self.btn_step["state"] = tk.DISABLED
+        self.btn_start["state"] = tk.DISABLED
+        self.ent_time["state"] = tk.DISABLED
 
+        if self.trace is not None:
             self._jop = window.after(interval, self.start)
             self.step()
-        except ValueError:
-            messagebox.showerror("Error", "interval must be an integer")
+            return
+
+        if self._jop is not None:
+            window.after_cancel(self._jop)
+        self.start_worker()
+        self.interval = max(interval, 1) / 1000
+        self._due = time.perf_counter()
+        self.play()
+
+    def play(self):
+        # one frame per interval; if drawing took longer than that, the frames of the missed intervals
+        # are applied as well but only the last one is drawn
+        self._jop = None
+        now = time.perf_counter()
+        missed = max(int((now - self._due) / self.interval), 0)
+
+        frames = []
+        while len(frames) <= missed:
+            frame = self.worker.get(block=False)
+            if frame is None:
+                break
+            frames.append(frame)
+
+        if frames:
+            self.advance(frames)
+            self._due += (missed + 1) * self.interval
+        elif self.worker.done:
+            self.algorithm_terminated()
+            return
+        else:
+            # waiting for the worker is no reason to skip frames later
+            self._due = now + min(self.interval, self.POLL_INTERVAL / 1000)
+
+        delay = round((self._due - time.perf_counter()) * 1000)
+        self._jop = window.after(max(delay, 1), self.play)
 
     def stop(self):
         self.btn_step["state"] = tk.NORMAL
@@ -391,28 +580,72 @@ C: max capacity
 implemented algorithms:
 Ford-Fulkerson: O(m F)
 Edmonds-Karp: O(n m^2)
+Edmonds-Karp (bidirectional): O(n m^2)
 Capacity Scaling: O(n m logC)
+Capacity Scaling (bidirectional): O(n m logC)
 Dinic: O(m n^2)
+Dinic (dynamic trees): O(n m log n)
 Goldberg-Tarjan: O(n^3)
+Goldberg-Tarjan (highest label): O(n^2 sqrt(m))
+Boykov-Kolmogorov: O(m n^2 F)
 
 node colors:
 source: blue
 target: purple
 
 node text:
-Dinic: distance
+Dinic: distance (also with dynamic trees)
 Goldberg-Tarjan: label and excess
+Boykov-Kolmogorov: search tree (S or T)
+
+arc colors (Boykov-Kolmogorov):
+source tree: blue
+target tree: purple
+
+view:
+mouse wheel: zoom, drag: pan, double click: whole graph
+zoomed out, arcs lose their labels and are coloured
+by utilisation (grey: no flow, red: saturated),
+large graphs are shown as a grid of such colours
+
+replay:
+record runs the selected algorithm into a trace file,
+afterwards step, back and the slider move through its steps
 """)
 
 
 class TestEnvironment(tk.Frame):
-    EDGE_CHANGES = 5
+    POLL_INTERVAL = 50
 
     def __init__(self, parent):
         super().__init__(parent)
 
-        self.btn_start = tk.Button(text="start", master=self, command=self.start_test)
-        self.btn_start.pack(fill="x")
+        control_bar = tk.Frame(self)
+
+        self.btn_start = tk.Button(text="start", master=control_bar, command=self.start_test)
+        self.btn_start.grid(row=0, column=0, padx=10)
+
+        self.btn_cancel = tk.Button(text="cancel", master=control_bar, command=self.cancel_test, state=tk.DISABLED)
+        self.btn_cancel.grid(row=0, column=1, padx=10)
+
+        lbl_workers = tk.Label(master=control_bar, text="Workers:")
+        lbl_workers.grid(row=0, column=2)
+
+        self.ent_workers = tk.Entry(master=control_bar, width=10)
+        self.ent_workers.insert(0, str(os.cpu_count() or 1))
+        self.ent_workers.grid(row=0, column=3, padx=5)
+
+        self.ent_seed = widgets.EntryWithPlaceholder(master=control_bar, placeholder="seed (optional)")
+        self.ent_seed.grid(row=0, column=4, padx=10)
+
+        self.btn_report = tk.Button(text="save report", master=control_bar, command=self.save_report,
+                                    state=tk.DISABLED)
+        self.btn_report.grid(row=0, column=5, padx=10)
+
+        self.lbl_progress = tk.Label(master=control_bar, text="")
+        self.lbl_progress.grid(row=0, column=6, padx=10)
+
+        control_bar.pack(fill="x")
 
         lbl_info = tk.Label(text="Please enter one comma separated triple per line: instances, nodes, capacity",
                             master=self)
@@ -431,128 +664,130 @@ class TestEnvironment(tk.Frame):
         scroll_output.config(command=self.txt_output.yview)
         self.txt_output.pack(fill="both", expand=True)
 
+        self.executor = None
+        self.output = []
+        self.reports = []
+        self.finished = 0
+        self.total = 0
+        self._jop = None
+
     def start_test(self):
+        try:
+            workers = int(self.ent_workers.get())
+            seed = int(self.ent_seed.get()) if self.ent_seed["fg"] != self.ent_seed.placeholder_color else None
+
+            triples = []
+            for line in self.txt_triples.get(1.0, "end-1c").split("\n"):
+                line = line.strip()
+                if line:
+                    triples.append(tuple(map(int, line.split(","))))
+            if workers < 1 or any(len(triple) != 3 for triple in triples):
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "invalid input")
+            return
+
         self.txt_output.config(state=tk.NORMAL)
         self.txt_output.delete(1.0, "end-1c")
-
-        triples = self.txt_triples.get(1.0, "end-1c")
-        for line in triples.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                instances, nodes, capacity = map(int, line.split(","))
-                self.test_triple(instances, nodes, capacity)
-            except ValueError:
-                messagebox.showerror("Error", "invalid input")
-                return
-
-            self.txt_output.insert("end-1c", "\n\n")
         self.txt_output.config(state=tk.DISABLED)
 
-    def test_triple(self, instances: int, nodes: int, capacity: int):
-        self.txt_output.insert("end-1c", f"instances: {instances}\nnodes: {nodes}\ncapacity: {capacity}\n")
-
-        for _ in range(instances):
-            source, target, graph = random_graph.generate(nodes, capacity)
-
-            results = []
-            flow_values = []
-
-            for name, algo_func in ALGORITHMS_MAP.items():
-                graph.reset()
-
-                for _ in algo_func(graph, source, target):
-                    pass
-
-                # capacity bound check
-                capacity_bound = True
-                flow_in = [0 for _ in range(graph.number_of_nodes())]
-                flow_out = [0 for _ in range(graph.number_of_nodes())]
-
-                for edge in graph.get_edges():
-                    if not edge.reverse:
-                        flow_out[edge.start] += edge.flow
-                        flow_in[edge.end] += edge.flow
-                        if edge.flow > edge.capacity:
-                            capacity_bound = False
-
-                # flow preservation check
-                flow_preservation = all(flow_in[i] == flow_out[i] for i in range(graph.number_of_nodes())
-                                        if i not in (source, target))
-
-                saturated_cut = max_flow.bfs(graph, source, target) is None
-
-                flow = flow_out[source] - flow_in[source]
-                flow_values.append(flow)
-
-                results.append([name, flow_preservation, capacity_bound, saturated_cut, flow])
-
-            # change edge values (capacities)
-            change_capacity_passed = True
-            if len(set(flow_values)) == 1:
-                flow_value = flow_values[0]
-
-                for _ in range(self.EDGE_CHANGES):
-                    graph_copy = graph.copy()
-                    edge = random.choice(graph_copy.get_base_edges())
-                    capacity_change = random.randint(1, capacity)
-
-                    flow_values = []
-
-                    edge.capacity += capacity_change
+        # output chunks in input order, the tables are futures until their instance is solved
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.output = []
+        seeds = iter(verification.instance_seeds(sum(instances for instances, _, _ in triples), seed))
+        for instances, nodes, capacity in triples:
+            self.output.append(f"instances: {instances}\nnodes: {nodes}\ncapacity: {capacity}\n")
+            for _ in range(instances):
+                self.output.append(self.executor.submit(verification.run_instance, nodes, capacity, next(seeds)))
+            self.output.append("\n\n")
+
+        self.reports = []
+        self.finished = 0
+        self.total = len(self.output) - 2 * len(triples)
+        self.btn_start["state"] = tk.DISABLED
+        self.btn_report["state"] = tk.DISABLED
+        self.btn_cancel["state"] = tk.NORMAL
+        self.poll_results()
 
-                    for name, algo_func in ALGORITHMS_MAP.items():
-                        graph_copy.reset()
-                        for _ in algo_func(graph_copy, source, target):
-                            pass
-                        flow_value_new = utils.flow_value(graph_copy, source)
-                        flow_values.append(flow_value_new)
+    def poll_results(self):
+        self.txt_output.config(state=tk.NORMAL)
+        while self.output:
+            chunk = self.output[0]
+            if isinstance(chunk, str):
+                self.txt_output.insert("end-1c", chunk)
+            elif chunk.done():
+                try:
+                    table, report = chunk.result()
+                    self.txt_output.insert("end-1c", table)
+                    self.reports.append(report)
+                except Exception as exception:
+                    self.txt_output.insert("end-1c", f"\ninstance failed: {exception!r}\n")
+                self.finished += 1
+            else:
+                break
+            self.output.pop(0)
+        self.txt_output.tag_add("center", "1.0", "end")
+        self.txt_output.config(state=tk.DISABLED)
 
-                        if not (flow_value <= flow_value_new <= flow_value + capacity_change):
-                            change_capacity_passed = False
+        self.lbl_progress["text"] = f"{self.finished} / {self.total} instances"
+        if self.output:
+            self._jop = self.after(self.POLL_INTERVAL, self.poll_results)
+        else:
+            self.stop_executor()
 
-                    if len(set(flow_values)) != 1:
-                        change_capacity_passed = False
+    def cancel_test(self):
+        self.stop_executor()
+        self.lbl_progress["text"] = f"cancelled after {self.finished} / {self.total} instances"
 
-            self.txt_output.insert("end-1c", "\n" +
-                                   tabulate(results,
-                                            headers=["Algorithm", "flow preservation", "capacity bound", "saturated cut", "max flow"],
-                                            tablefmt="fancy_grid") +
-                                   "\n" +
-                                   f"identical max flow value: {len(set(flow_values)) == 1}\n" +
-                                   f"edge value changes passed: {change_capacity_passed}\n")
+    def stop_executor(self):
+        if self._jop is not None:
+            self.after_cancel(self._jop)
+            self._jop = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.output = []
+        self.btn_start["state"] = tk.NORMAL
+        self.btn_cancel["state"] = tk.DISABLED
+        if self.reports:
+            self.btn_report["state"] = tk.NORMAL
 
-            self.txt_output.tag_add("center", "1.0", "end")
+    def save_report(self):
+        # the counters and checks of every finished instance
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if path:
+            with open(path, "w") as file:
+                json.dump(self.reports, file, indent=2)
 
 
-window = tk.Tk()
-window.title("Max-Flow Algorithms")
+if __name__ == "__main__":
+    window = tk.Tk()
+    window.title("Max-Flow Algorithms")
 
-window_width = 1200
-window_height = 1200
-screen_width = window.winfo_screenwidth()
-screen_height = window.winfo_screenheight()
-screen_x = int((screen_width / 2) - (window_width / 2))
-screen_y = int((screen_height / 2) - (window_height / 2))
-window.geometry(f"{window_width}x{window_height}+{screen_x}+{screen_y}")
+    window_width = 1200
+    window_height = 1200
+    screen_width = window.winfo_screenwidth()
+    screen_height = window.winfo_screenheight()
+    screen_x = int((screen_width / 2) - (window_width / 2))
+    screen_y = int((screen_height / 2) - (window_height / 2))
+    window.geometry(f"{window_width}x{window_height}+{screen_x}+{screen_y}")
 
-window.columnconfigure(0, weight=1)
-window.rowconfigure(0, weight=1)
+    window.columnconfigure(0, weight=1)
+    window.rowconfigure(0, weight=1)
 
-style = ttk.Style(window)
-style.configure("TNotebook.Tab", width=window.winfo_screenwidth())
+    style = ttk.Style(window)
+    style.configure("TNotebook.Tab", width=window.winfo_screenwidth())
 
-tabs = ttk.Notebook(window)
+    tabs = ttk.Notebook(window)
 
-frame_visualization = Visualization(tabs)
-frame_visualization.pack()
-tabs.add(frame_visualization, text="Visualization")
+    frame_visualization = Visualization(tabs)
+    frame_visualization.pack()
+    tabs.add(frame_visualization, text="Visualization")
 
-frame_test_environment = TestEnvironment(tabs)
-frame_test_environment.pack()
-tabs.add(frame_test_environment, text="Test environment")
+    frame_test_environment = TestEnvironment(tabs)
+    frame_test_environment.pack()
+    tabs.add(frame_test_environment, text="Test environment")
 
-tabs.pack(expand=True, fill="both")
+    tabs.pack(expand=True, fill="both")
 
-window.mainloop()
+    window.mainloop()
@@ -1,10 +1,68 @@
+import functools
 import math
+import time
 from collections import deque
 
 from graph import Graph, Edge
-
-
-def dfs(graph: Graph, source: int, target: int) -> tuple[list[Edge], list[int]]:
+from link_cut_tree import LinkCutTree
+
+# search trees of boykov_kolmogorov and bidirectional_bfs_capacity
+FREE = 0
+SOURCE_TREE = 1
+TARGET_TREE = 2
+
+
+class Counters:
+    # operation counts of one run, only updated when passed to an algorithm as stats,
+    # so the checks stay out of the per-arc loops: arcs_scanned counts whole adjacency lists
+    # of expanded nodes and the arcs passed by current-arc pointers
+    def __init__(self):
+        self.augmentations = 0
+        self.arcs_scanned = 0
+        self.searches = 0
+        self.saturating_pushes = 0
+        self.non_saturating_pushes = 0
+        self.relabels = 0
+        self.global_relabels = 0
+        self.phases = 0
+        self.phase_times = []
+        self._phase_start = None
+
+    def start_phase(self):
+        self.end_phase()
+        self._phase_start = time.perf_counter()
+
+    def end_phase(self):
+        # phases spanning yields include the time the caller spends between steps
+        if self._phase_start is not None:
+            self.phases += 1
+            self.phase_times.append(time.perf_counter() - self._phase_start)
+            self._phase_start = None
+
+    def as_dict(self) -> dict:
+        return {"augmentations": self.augmentations,
+                "arcs_scanned": self.arcs_scanned,
+                "searches": self.searches,
+                "saturating_pushes": self.saturating_pushes,
+                "non_saturating_pushes": self.non_saturating_pushes,
+                "relabels": self.relabels,
+                "global_relabels": self.global_relabels,
+                "phases": self.phases,
+                "phase_times": self.phase_times}
+
+
+def cached_arcs(algorithm):
+    # runs an algorithm that scans the same adjacency lists again and again inside graph.cached_arcs()
+    @functools.wraps(algorithm)
+    def run(graph, *args, **kwargs):
+        with graph.cached_arcs():
+            yield from algorithm(graph, *args, **kwargs)
+    return run
+
+
+def dfs(graph: Graph, source: int, target: int, stats: Counters = None) -> tuple[list[Edge], list[int]]:
+    if stats is not None:
+        stats.searches += 1
     parent = [None] * graph.number_of_nodes()
     stack = deque([source])
 
@@ -14,7 +72,10 @@ def dfs(graph: Graph, source: int, target: int) -> tuple[list[Edge], list[int]]:
     while stack:
         u = stack.popleft()
 
-        for edge in graph.get_edges_by_node(u):
+        edges = graph.get_edges_by_node(u)
+        if stats is not None:
+            stats.arcs_scanned += len(edges)
+        for edge in edges:
             if not visited[edge.end] and edge.residual_capacity() > 0:
                 stack.appendleft(edge.end)
                 visited[edge.end] = True
@@ -23,7 +84,10 @@ def dfs(graph: Graph, source: int, target: int) -> tuple[list[Edge], list[int]]:
                     return parent, []
 
 
-def bfs_capacity(graph: Graph, source: int, target: int, delta: int) -> tuple[list[Edge], list[int]]:
+def bfs_capacity(graph: Graph, source: int, target: int, delta: int,
+                 stats: Counters = None) -> tuple[list[Edge], list[int]]:
+    if stats is not None:
+        stats.searches += 1
     parent = [None] * graph.number_of_nodes()
     level = [-1] * graph.number_of_nodes()
     level[source] = 0
@@ -35,7 +99,10 @@ def bfs_capacity(graph: Graph, source: int, target: int, delta: int) -> tuple[li
     while queue:
         u = queue.popleft()
 
-        for edge in graph.get_edges_by_node(u):
+        edges = graph.get_edges_by_node(u)
+        if stats is not None:
+            stats.arcs_scanned += len(edges)
+        for edge in edges:
             if not visited[edge.end] and edge.residual_capacity() >= delta:
                 queue.append(edge.end)
                 visited[edge.end] = True
@@ -45,12 +112,88 @@ def bfs_capacity(graph: Graph, source: int, target: int, delta: int) -> tuple[li
                     return parent, level
 
 
-def bfs(graph: Graph, source: int, target: int) -> tuple[list[Edge], list[int]]:
-    return bfs_capacity(graph, source, target, 1)
-
-
-def ford_fulkerson(graph: Graph, source: int, target: int, path_algo=dfs):
-    while result := path_algo(graph, source, target):
+def bfs(graph: Graph, source: int, target: int, stats: Counters = None) -> tuple[list[Edge], list[int]]:
+    return bfs_capacity(graph, source, target, 1, stats)
+
+
+def bidirectional_bfs_capacity(graph: Graph, source: int, target: int, delta: int,
+                               stats: Counters = None) -> tuple[list[Edge], list[int]]:
+    # grows one search from the source over residual arcs and one from the target over the arcs into it,
+    # a whole level of the smaller frontier at a time, until an arc joins them; all arcs joining them
+    # while one level is expanded close paths of the same length, so the path is still a shortest one
+    if stats is not None:
+        stats.searches += 1
+    n = graph.number_of_nodes()
+    # parent[v] is the arc into v on the source side, successor[v] the arc out of v on the target side
+    parent = [None] * n
+    successor = [None] * n
+    side = [FREE] * n
+    side[source] = SOURCE_TREE
+    side[target] = TARGET_TREE
+    forward = [source]
+    backward = [target]
+    meeting = None
+
+    while forward and backward and meeting is None:
+        frontier = []
+        if len(forward) <= len(backward):
+            for u in forward:
+                edges = graph.get_edges_by_node(u)
+                if stats is not None:
+                    stats.arcs_scanned += len(edges)
+                for edge in edges:
+                    if edge.residual_capacity() >= delta:
+                        if side[edge.end] == FREE:
+                            side[edge.end] = SOURCE_TREE
+                            parent[edge.end] = edge
+                            frontier.append(edge.end)
+                        elif side[edge.end] == TARGET_TREE:
+                            meeting = edge
+                            break
+                if meeting is not None:
+                    break
+            forward = frontier
+        else:
+            for u in backward:
+                edges = graph.get_edges_by_node(u)
+                if stats is not None:
+                    stats.arcs_scanned += len(edges)
+                for edge in edges:
+                    arc = edge.reverse_edge
+                    if arc.residual_capacity() >= delta:
+                        if side[arc.start] == FREE:
+                            side[arc.start] = TARGET_TREE
+                            successor[arc.start] = arc
+                            frontier.append(arc.start)
+                        elif side[arc.start] == SOURCE_TREE:
+                            meeting = arc
+                            break
+                if meeting is not None:
+                    break
+            backward = frontier
+
+    if meeting is None:
+        return None
+    # continue the parent chain along the target side, so paths are rebuilt from the target as usual
+    parent[meeting.end] = meeting
+    u = meeting.end
+    while u != target:
+        parent[successor[u].end] = successor[u]
+        u = successor[u].end
+    return parent, []
+
+
+def bidirectional_bfs(graph: Graph, source: int, target: int, stats: Counters = None) -> tuple[list[Edge], list[int]]:
+    return bidirectional_bfs_capacity(graph, source, target, 1, stats)
+
+
+@cached_arcs
+def ford_fulkerson(graph: Graph, source: int, target: int, path_algo=dfs, record: bool = True,
+                   stats: Counters = None):
+    if stats is not None:
+        stats.start_phase()
+
+    while result := path_algo(graph, source, target, stats):
         parent, *_ = result
         path_flow = math.inf
 
@@ -58,7 +201,8 @@ def ford_fulkerson(graph: Graph, source: int, target: int, path_algo=dfs):
         path = deque()
         while tmp != source:
             path_flow = min(path_flow, parent[tmp].residual_capacity())
-            path.appendleft(parent[tmp])
+            if record:
+                path.appendleft(parent[tmp])
             tmp = parent[tmp].start
 
         tmp = target
@@ -66,19 +210,35 @@ def ford_fulkerson(graph: Graph, source: int, target: int, path_algo=dfs):
             parent[tmp].adjust(path_flow)
             tmp = parent[tmp].start
 
-        yield list(path)
+        if stats is not None:
+            stats.augmentations += 1
+        yield list(path) if record else None
+
+    if stats is not None:
+        stats.end_phase()
+
 
+def edmonds_karp(graph: Graph, source: int, target: int, record: bool = True, stats: Counters = None):
+    yield from ford_fulkerson(graph, source, target, bfs, record, stats)
 
-def edmonds_karp(graph: Graph, source: int, target: int):
-    yield from ford_fulkerson(graph, source, target, bfs)
 
+def edmonds_karp_bidirectional(graph: Graph, source: int, target: int, record: bool = True,
+                               stats: Counters = None):
+    yield from ford_fulkerson(graph, source, target, bidirectional_bfs, record, stats)
 
-def capacity_scaling(graph: Graph, source: int, target: int):
+
+@cached_arcs
+def capacity_scaling(graph: Graph, source: int, target: int, path_algo=bfs_capacity, record: bool = True,
+                     stats: Counters = None):
     max_capacity = max(e.capacity for e in graph.get_edges())
     delta = 2 ** math.floor(math.log(max_capacity, 2))
 
+    # one phase per delta
     while delta >= 1:
-        while result := bfs_capacity(graph, source, target, delta):
+        if stats is not None:
+            stats.start_phase()
+
+        while result := path_algo(graph, source, target, delta, stats):
             parent, *_ = result
             path_flow = math.inf
 
@@ -86,7 +246,8 @@ def capacity_scaling(graph: Graph, source: int, target: int):
             path = deque()
             while tmp != source:
                 path_flow = min(path_flow, parent[tmp].residual_capacity())
-                path.appendleft(parent[tmp])
+                if record:
+                    path.appendleft(parent[tmp])
                 tmp = parent[tmp].start
 
             tmp = target
@@ -94,44 +255,166 @@ def capacity_scaling(graph: Graph, source: int, target: int):
                 parent[tmp].adjust(path_flow)
                 tmp = parent[tmp].start
 
-            yield list(path)
+            if stats is not None:
+                stats.augmentations += 1
+            yield list(path) if record else None
 
         delta /= 2
 
+    if stats is not None:
+        stats.end_phase()
+
+
+def capacity_scaling_bidirectional(graph: Graph, source: int, target: int, record: bool = True,
+                                   stats: Counters = None):
+    yield from capacity_scaling(graph, source, target, bidirectional_bfs_capacity, record, stats)
+
+
+@cached_arcs
+def dinic(graph: Graph, source: int, target: int, record: bool = True, stats: Counters = None):
+    def blocking_flow(level: list[int], edges: list):
+        # iterative dfs in the acyclic layer graph, current[u] is the next arc of u to try
+        current = [0] * graph.number_of_nodes()
+        adjacency = [None] * graph.number_of_nodes()
+        path = []
+        u = source
+
+        while True:
+            if u == target:
+                path_flow = min(edge.residual_capacity() for edge in path)
+                for edge in path:
+                    edge.adjust(path_flow)
+                if record:
+                    edges.extend(path)
+                if stats is not None:
+                    stats.augmentations += 1
+
+                # retreat to the tail of the first saturated edge and continue from there
+                saturated = next(i for i, edge in enumerate(path) if edge.residual_capacity() == 0)
+                del path[saturated:]
+                u = path[-1].end if path else source
+                continue
 
-def dinic(graph: Graph, source: int, target: int):
-    def blocking_flow(u: int, flow: int, start: list[int], level: list[int], edges: list):
-        # dfs in acyclic layer graph
-
-        if u == target:
-            return flow
-
-        while start[u] < graph.get_degree(u):
-            edge = graph.get_edges_by_node(u)[start[u]]  # edge.start == u
-            if level[edge.end] == level[edge.start] + 1 and edge.residual_capacity() > 0:
-                curr_flow = min(flow, edge.residual_capacity())
-                curr_flow = blocking_flow(edge.end, curr_flow, start, level, edges)
-
-                if curr_flow and curr_flow > 0:
-                    edge.adjust(curr_flow)
-                    edges.append(edge)
-                    return curr_flow
-            start[u] += 1
+            if adjacency[u] is None:
+                adjacency[u] = graph.get_edges_by_node(u)
+            arcs = adjacency[u]
+
+            i = current[u]
+            while i < len(arcs) and not (level[arcs[i].end] == level[u] + 1 and arcs[i].residual_capacity() > 0):
+                i += 1
+            if stats is not None:
+                stats.arcs_scanned += i - current[u] + (i < len(arcs))
+            current[u] = i
+
+            if i < len(arcs):
+                path.append(arcs[i])
+                u = arcs[i].end
+            elif u == source:
+                return
+            else:
+                # dead end, never enter u again in this phase
+                u = path.pop().start
+                current[u] += 1
+
+    while result := bfs(graph, source, target, stats):
+        _, level = result
+        edges = []
+        # one phase per blocking flow
+        if stats is not None:
+            stats.start_phase()
+        blocking_flow(level, edges)
+        if stats is not None:
+            stats.end_phase()
+        yield (edges, level) if record else None
+
+
+def dinic_dynamic_trees(graph: Graph, source: int, target: int, record: bool = True, stats: Counters = None):
+    n = graph.number_of_nodes()
+    adjacency = [graph.get_edges_by_node(u) for u in range(n)]
+
+    def blocking_flow(level: list[int], edges: list):
+        # the current arcs form a forest kept in a link-cut tree whose values are the residual capacities,
+        # so augmenting and retreating cost O(log n) amortized instead of the length of the path;
+        # the flow of a tree arc is only written back when it leaves the tree
+        tree = LinkCutTree(n)
+        current = [0] * n
+        tree_arc = [None] * n
+        linked_capacity = [0] * n
+        dead = [False] * n
+
+        def cut(u: int):
+            arc = tree_arc[u]
+            pushed = linked_capacity[u] - tree.cut(u)
+            if pushed:
+                arc.adjust(pushed)
+                if record:
+                    edges.append(arc)
+            tree_arc[u] = None
+
+        while True:
+            u = tree.find_root(source)
+            if u == target:
+                _, path_flow = tree.path_min(source)
+                tree.path_add(source, -path_flow)
+                if stats is not None:
+                    stats.augmentations += 1
+
+                # the saturated arcs leave the tree, their tails continue with their next arc
+                while True:
+                    v, residual = tree.path_min(source)
+                    if residual > 0:
+                        break
+                    cut(v)
+                    current[v] += 1
+                continue
 
-    while result := bfs(graph, source, target):
+            arcs = adjacency[u]
+            i = current[u]
+            while i < len(arcs) and not (level[arcs[i].end] == level[u] + 1 and not dead[arcs[i].end]
+                                         and arcs[i].residual_capacity() > 0):
+                i += 1
+            if stats is not None:
+                stats.arcs_scanned += i - current[u] + (i < len(arcs))
+            current[u] = i
+
+            if i < len(arcs):
+                tree_arc[u] = arcs[i]
+                linked_capacity[u] = arcs[i].residual_capacity()
+                tree.link(u, arcs[i].end, linked_capacity[u])
+            elif u == source:
+                break
+            else:
+                # dead end, its children in the tree move on to their next arc
+                dead[u] = True
+                for arc in arcs:
+                    v = arc.end
+                    if tree_arc[v] is not None and tree_arc[v].end == u:
+                        cut(v)
+                        current[v] += 1
+
+        for u in range(n):
+            if tree_arc[u] is not None:
+                cut(u)
+
+    while result := bfs(graph, source, target, stats):
         _, level = result
-        start = [0] * (graph.number_of_nodes() + 1)
         edges = []
-        while _ := blocking_flow(source, math.inf, start, level, edges):
-            pass
-        yield edges, level
+        if stats is not None:
+            stats.start_phase()
+        blocking_flow(level, edges)
+        if stats is not None:
+            stats.end_phase()
+        yield (edges, level) if record else None
 
 
-def goldberg_tarjan(graph: Graph, source: int, target: int):
+@cached_arcs
+def goldberg_tarjan(graph: Graph, source: int, target: int, record: bool = True, stats: Counters = None):
     excess = [0] * graph.number_of_nodes()
     label = [0] * graph.number_of_nodes()
     active = deque()
     in_queue = [False] * graph.number_of_nodes()
+    # nodes relabeled since the last step
+    relabeled = set()
 
     def preflow():
         edges = []
@@ -145,12 +428,18 @@ def goldberg_tarjan(graph: Graph, source: int, target: int):
                     active.append(edge.end)
                     in_queue[edge.end] = True
 
-                edges.append(edge)
-        return edges, excess, label, source
+                if record:
+                    edges.append(edge)
+                if stats is not None:
+                    stats.saturating_pushes += 1
+        return (edges, excess, label, source, {source}) if record else None
 
     def push(node: int):
         edges = []
-        for edge in graph.get_edges_by_node(node):
+        arcs = graph.get_edges_by_node(node)
+        if stats is not None:
+            stats.arcs_scanned += len(arcs)
+        for edge in arcs:
             if edge.residual_capacity() == 0:
                 continue
 
@@ -161,18 +450,37 @@ def goldberg_tarjan(graph: Graph, source: int, target: int):
                     excess[edge.start] -= flow
                     excess[edge.end] += flow
                     edge.adjust(flow)
-                    edges.append(edge)
+                    if record:
+                        edges.append(edge)
+                    if stats is not None:
+                        if edge.residual_capacity() == 0:
+                            stats.saturating_pushes += 1
+                        else:
+                            stats.non_saturating_pushes += 1
 
                     if edge.end not in (source, target) and excess[edge.end] > 0 and not in_queue[edge.end]:
                         active.append(edge.end)
                         in_queue[edge.end] = True
 
-        return edges, excess, label, node
+        if not record:
+            return None
+        step = (edges, excess, label, node, set(relabeled))
+        relabeled.clear()
+        return step
 
     def relabel(node: int):
         label[node] = 1 + min(label[edge.end]
                               for edge in graph.get_edges_by_node(node)
                               if edge.residual_capacity() > 0)
+        if record:
+            relabeled.add(node)
+        if stats is not None:
+            stats.relabels += 1
+            stats.arcs_scanned += len(graph.get_edges_by_node(node))
+
+    # the whole run is one phase
+    if stats is not None:
+        stats.start_phase()
 
     yield preflow()
 
@@ -190,3 +498,366 @@ def goldberg_tarjan(graph: Graph, source: int, target: int):
         if u not in (source, target) and excess[u] > 0:
             active.append(u)
             in_queue[u] = True
+
+    if stats is not None:
+        stats.end_phase()
+
+
+def goldberg_tarjan_highest_label(graph: Graph, source: int, target: int, record: bool = True,
+                                  stats: Counters = None):
+    n = graph.number_of_nodes()
+    excess = [0] * n
+    label = [0] * n
+    count = [0] * (2 * n + 1)
+    current = [0] * n
+    adjacency = [graph.get_edges_by_node(u) for u in range(n)]
+    # active nodes by label, entries whose label changed in the meantime are skipped when popped
+    buckets = [[] for _ in range(2 * n + 1)]
+    highest = 0
+    relabels = 0
+    # nodes relabeled since the last step, None after a global relabeling
+    relabeled = set()
+
+    def activate(node: int):
+        nonlocal highest
+        if node not in (source, target) and excess[node] > 0:
+            buckets[label[node]].append(node)
+            highest = max(highest, label[node])
+
+    def preflow():
+        edges = []
+        for edge in adjacency[source]:
+            if not edge.reverse:
+                edge.flow = edge.capacity
+                excess[edge.end] += edge.flow
+                if record:
+                    edges.append(edge)
+                if stats is not None:
+                    stats.saturating_pushes += 1
+        return (edges, excess, label, source, {source}) if record else None
+
+    def global_relabel():
+        # exact distances to the target by reverse bfs, nodes that cannot reach it get n + distance to the source
+        nonlocal highest, relabels, relabeled
+        # a phase ends with every global relabeling
+        if stats is not None:
+            stats.start_phase()
+            stats.global_relabels += 1
+
+        for u in range(n):
+            label[u] = 2 * n
+        label[target] = 0
+        label[source] = n
+
+        for root in (target, source):
+            queue = deque([root])
+            while queue:
+                v = queue.popleft()
+                if stats is not None:
+                    stats.arcs_scanned += len(adjacency[v])
+                for edge in adjacency[v]:
+                    if label[edge.end] == 2 * n and edge.reverse_edge.residual_capacity() > 0:
+                        label[edge.end] = label[v] + 1
+                        queue.append(edge.end)
+
+        for i in range(2 * n + 1):
+            count[i] = 0
+            buckets[i].clear()
+        for u in range(n):
+            count[label[u]] += 1
+            current[u] = 0
+
+        highest = 0
+        relabels = 0
+        relabeled = None
+        for u in range(n):
+            activate(u)
+
+    def relabel(node: int):
+        nonlocal relabels
+        old_label = label[node]
+        label[node] = 1 + min(label[edge.end] for edge in adjacency[node] if edge.residual_capacity() > 0)
+        count[old_label] -= 1
+        count[label[node]] += 1
+        current[node] = 0
+        relabels += 1
+        if record and relabeled is not None:
+            relabeled.add(node)
+        if stats is not None:
+            stats.relabels += 1
+            stats.arcs_scanned += len(adjacency[node])
+
+        if old_label < n and count[old_label] == 0:
+            # gap: the nodes above old_label cannot reach the target anymore
+            for u in range(n):
+                if old_label < label[u] < n:
+                    count[label[u]] -= 1
+                    label[u] = n + 1
+                    count[label[u]] += 1
+                    current[u] = 0
+                    if u != node:
+                        activate(u)
+                    if record and relabeled is not None:
+                        relabeled.add(u)
+
+    def discharge(node: int):
+        edges = []
+        # arcs passed by the current-arc pointer since first, counted per relabeling and at the end
+        first = current[node]
+        while excess[node] > 0:
+            arcs = adjacency[node]
+            if current[node] == len(arcs):
+                if stats is not None:
+                    stats.arcs_scanned += len(arcs) - first
+                relabel(node)
+                first = 0
+                continue
+
+            edge = arcs[current[node]]
+            residual_capacity = edge.residual_capacity()
+            if residual_capacity > 0 and label[node] == label[edge.end] + 1:
+                flow = min(residual_capacity, excess[node])
+                if excess[edge.end] == 0:
+                    excess[edge.end] += flow
+                    activate(edge.end)
+                else:
+                    excess[edge.end] += flow
+                excess[node] -= flow
+                edge.adjust(flow)
+                if record:
+                    edges.append(edge)
+                if stats is not None:
+                    if flow == residual_capacity:
+                        stats.saturating_pushes += 1
+                    else:
+                        stats.non_saturating_pushes += 1
+            else:
+                current[node] += 1
+
+        if stats is not None:
+            stats.arcs_scanned += current[node] - first + 1
+        return edges
+
+    yield preflow()
+    global_relabel()
+
+    while True:
+        while highest > 0 and not buckets[highest]:
+            highest -= 1
+        if not buckets[highest]:
+            break
+
+        u = buckets[highest].pop()
+        if excess[u] == 0 or label[u] != highest:
+            continue
+
+        edges = discharge(u)
+        yield (edges, excess, label, u, relabeled) if record else None
+        relabeled = set()
+
+        if relabels >= n:
+            global_relabel()
+
+    if stats is not None:
+        stats.end_phase()
+
+
+def boykov_kolmogorov(graph: Graph, source: int, target: int, record: bool = True, stats: Counters = None):
+    # search trees from the source (S) and the target (T) are grown until they touch, augmented along and kept:
+    # nodes cut off by saturated tree arcs become orphans that look for a new parent in their tree or become free
+    n = graph.number_of_nodes()
+    adjacency = [graph.get_edges_by_node(u) for u in range(n)]
+    tree = [FREE] * n
+    # S: arc from the parent to the node, T: arc from the node to the parent, both with residual capacity
+    parent = [None] * n
+    tree[source] = SOURCE_TREE
+    tree[target] = TARGET_TREE
+    active = deque([source, target])
+    in_active = [False] * n
+    in_active[source] = in_active[target] = True
+    orphans = deque()
+    # distance to the root, valid for nodes with the current timestamp, saves walking up to the roots
+    timestamp = [0] * n
+    distance = [0] * n
+    clock = 0
+    # nodes whose tree or parent changed since the last step
+    changed = set()
+
+    def activate(node: int):
+        if not in_active[node]:
+            active.append(node)
+            in_active[node] = True
+
+    def grow():
+        # the arc connecting both trees, or None if the trees cannot grow anymore
+        while active:
+            p = active[0]
+            if tree[p] != FREE:
+                arcs = adjacency[p]
+                if stats is not None:
+                    stats.arcs_scanned += len(arcs)
+                for edge in arcs:
+                    # arc from the S tree outwards or into the T tree
+                    arc = edge if tree[p] == SOURCE_TREE else edge.reverse_edge
+                    if arc.residual_capacity() == 0:
+                        continue
+                    q = edge.end
+                    if tree[q] == FREE:
+                        tree[q] = tree[p]
+                        parent[q] = arc
+                        timestamp[q] = timestamp[p]
+                        distance[q] = distance[p] + 1
+                        activate(q)
+                        if record:
+                            changed.add(q)
+                    elif tree[q] != tree[p]:
+                        return arc
+            active.popleft()
+            in_active[p] = False
+        return None
+
+    def augment_path(arc) -> list:
+        path = deque([arc])
+        v = arc.start
+        while v != source:
+            path.appendleft(parent[v])
+            v = parent[v].start
+        v = arc.end
+        while v != target:
+            path.append(parent[v])
+            v = parent[v].end
+
+        path_flow = min(edge.residual_capacity() for edge in path)
+        for edge in path:
+            edge.adjust(path_flow)
+            if edge.residual_capacity() == 0:
+                if tree[edge.start] == tree[edge.end] == SOURCE_TREE:
+                    parent[edge.end] = None
+                    orphans.append(edge.end)
+                elif tree[edge.start] == tree[edge.end] == TARGET_TREE:
+                    parent[edge.start] = None
+                    orphans.append(edge.start)
+        return list(path)
+
+    def root_distance(node: int, side: int):
+        # distance of node to its root, None if the way up ends at an orphan
+        steps = 0
+        v = node
+        while timestamp[v] != clock:
+            if parent[v] is None:
+                return None
+            v = parent[v].start if side == SOURCE_TREE else parent[v].end
+            steps += 1
+        total = steps + distance[v]
+
+        d = total
+        v = node
+        while timestamp[v] != clock:
+            timestamp[v] = clock
+            distance[v] = d
+            d -= 1
+            v = parent[v].start if side == SOURCE_TREE else parent[v].end
+        return total
+
+    def adopt():
+        while orphans:
+            o = orphans.popleft()
+            side = tree[o]
+            arcs = adjacency[o]
+            if stats is not None:
+                stats.arcs_scanned += len(arcs)
+
+            best, best_distance = None, math.inf
+            for edge in arcs:
+                q = edge.end
+                arc = edge.reverse_edge if side == SOURCE_TREE else edge
+                if tree[q] == side and arc.residual_capacity() > 0:
+                    d = root_distance(q, side)
+                    if d is not None and d < best_distance:
+                        best, best_distance = arc, d
+
+            if record:
+                changed.add(o)
+            if best is not None:
+                parent[o] = best
+                timestamp[o] = clock
+                distance[o] = best_distance + 1
+                continue
+
+            # no parent left: the neighbours may grow into o again, its children become orphans
+            for edge in arcs:
+                q = edge.end
+                if tree[q] != side:
+                    continue
+                arc = edge.reverse_edge if side == SOURCE_TREE else edge
+                if arc.residual_capacity() > 0:
+                    activate(q)
+                child_arc = parent[q]
+                if child_arc is not None and (child_arc.start if side == SOURCE_TREE else child_arc.end) == o:
+                    parent[q] = None
+                    orphans.append(q)
+            tree[o] = FREE
+
+    # the whole run is one phase
+    if stats is not None:
+        stats.start_phase()
+
+    while (arc := grow()) is not None:
+        clock += 1
+        timestamp[source] = timestamp[target] = clock
+        path = augment_path(arc)
+        adopt()
+        if stats is not None:
+            stats.augmentations += 1
+
+        if record:
+            step = (path, tree, parent, set(changed))
+            changed.clear()
+            yield step
+        else:
+            yield None
+
+    if stats is not None:
+        stats.end_phase()
+
+
+def augment(graph: Graph, source: int, target: int, limit=math.inf):
+    # pushes up to limit units along shortest augmenting paths and returns the amount pushed
+    pushed = 0
+    with graph.cached_arcs():
+        while pushed < limit and (result := bfs(graph, source, target)):
+            parent, *_ = result
+            path_flow = limit - pushed
+
+            tmp = target
+            while tmp != source:
+                path_flow = min(path_flow, parent[tmp].residual_capacity())
+                tmp = parent[tmp].start
+
+            tmp = target
+            while tmp != source:
+                parent[tmp].adjust(path_flow)
+                tmp = parent[tmp].start
+
+            pushed += path_flow
+    return pushed
+
+
+def update_capacities(graph: Graph, source: int, target: int, changes: list[tuple[Edge, int]]):
+    # changes the capacities of a graph holding a maximum flow and repairs the flow instead of solving from zero
+    for edge, delta in changes:
+        edge.capacity += delta
+        overflow = edge.flow - edge.capacity
+        if overflow <= 0:
+            continue
+
+        # edge.start now has overflow units too much inflow and edge.end too little
+        edge.flow = edge.capacity
+        overflow -= augment(graph, edge.start, edge.end, overflow)
+        if overflow > 0:
+            if edge.start not in (source, target):
+                augment(graph, edge.start, source, overflow)
+            if edge.end not in (source, target):
+                augment(graph, target, edge.end, overflow)
+
+    augment(graph, source, target)
@@ -0,0 +1,236 @@
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+GLOBAL_RELABEL_INTERVAL = 1
+# shared arrays: name, dtype, length in nodes or arcs; residual, excess and label are written by the
+# workers, every worker only writes the nodes of its region and the arcs leaving them
+SHARED = (("offsets", np.int64, "nodes + 1"),
+          ("head", np.int32, "arcs"),
+          ("pair", np.int32, "arcs"),
+          ("residual", np.int64, "arcs"),
+          ("excess", np.int64, "nodes"),
+          ("label", np.int64, "nodes"),
+          ("ghost", np.int64, "nodes"))
+
+# state of a worker process, attached once by attach
+_shared = {}
+
+
+def attach(names: dict, n: int, m: int):
+    # typed memoryviews on the shared memory, indexing them yields python ints without copying the arrays
+    for name, dtype, length in SHARED:
+        memory = shared_memory.SharedMemory(name=names[name])
+        size = n + 1 if length == "nodes + 1" else n if length == "nodes" else m
+        itemsize = np.dtype(dtype).itemsize
+        _shared[name] = memory.buf[:size * itemsize].cast(np.dtype(dtype).char)
+        # the view must not outlive the mapping
+        _shared[name + "_memory"] = memory
+
+
+def discharge_region(lo: int, hi: int, source: int, target: int) -> tuple:
+    # fifo push-relabel on the nodes lo .. hi - 1 until none of them is active; labels of other nodes are
+    # read from ghost, the labels at the start of the round, and pushes over arcs leaving the region
+    # are only taken from the arc and returned, the coordinator hands them to the other side.
+    # The region writes the shared arrays in place: its nodes and the arcs leaving them belong to it alone
+    offsets, head, pair = _shared["offsets"], _shared["head"], _shared["pair"]
+    residual, excess, label, ghost = _shared["residual"], _shared["excess"], _shared["label"], _shared["ghost"]
+    limit = 2 * len(ghost)
+    current = offsets[lo:hi].tolist()
+
+    def label_of(v: int):
+        return label[v] if lo <= v < hi else ghost[v]
+
+    active = deque(u for u in range(lo, hi)
+                   if excess[u] > 0 and u != source and u != target and label[u] < limit)
+    boundary_arcs, boundary_amounts = [], []
+    saturating = non_saturating = relabels = 0
+
+    while active:
+        u = active.popleft()
+        i = u - lo
+        while excess[u] > 0:
+            a = current[i]
+            if a == offsets[u + 1]:
+                label[u] = min((label_of(head[b]) + 1 for b in range(offsets[u], a) if residual[b] > 0),
+                               default=limit)
+                current[i] = offsets[u]
+                relabels += 1
+                if label[u] >= limit:
+                    break
+                continue
+
+            v = head[a]
+            if residual[a] > 0 and label[u] == label_of(v) + 1:
+                amount = min(excess[u], residual[a])
+                if amount == residual[a]:
+                    saturating += 1
+                else:
+                    non_saturating += 1
+                residual[a] -= amount
+                excess[u] -= amount
+                if lo <= v < hi:
+                    residual[pair[a]] += amount
+                    if excess[v] == 0 and v != source and v != target:
+                        active.append(v)
+                    excess[v] += amount
+                else:
+                    boundary_arcs.append(a)
+                    boundary_amounts.append(amount)
+            else:
+                current[i] = a + 1
+
+    return (np.array(boundary_arcs, dtype=np.int64), np.array(boundary_amounts, dtype=np.int64),
+            saturating, non_saturating, relabels)
+
+
+def global_relabel(offsets: np.ndarray, head: np.ndarray, pair: np.ndarray, residual: np.ndarray,
+                   label: np.ndarray, source: int, target: int):
+    # exact labels from breadth-first searches over the residual arcs into the target, then into the source
+    # for the nodes that cannot reach the target, a whole level at a time like frontier.bfs_capacity
+    n = len(label)
+    label[:] = 2 * n
+    label[target] = 0
+    label[source] = n
+
+    for root in (target, source):
+        frontier = np.array([root])
+        depth = label[root]
+        while frontier.size:
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            if counts.sum() == 0:
+                break
+            arcs = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            # arc w -> x of a frontier node w, x reaches w if its reverse arc x -> w has residual capacity
+            arcs = arcs[residual[pair[arcs]] > 0]
+            ends = head[arcs]
+            frontier = np.unique(ends[label[ends] == 2 * n])
+            depth += 1
+            label[frontier] = depth
+
+
+def regions(offsets: np.ndarray, count: int) -> list[tuple[int, int]]:
+    # contiguous node ranges with about the same number of arcs each
+    n = len(offsets) - 1
+    bounds = np.searchsorted(offsets, np.linspace(0, offsets[-1], count + 1)).clip(0, n)
+    bounds[0], bounds[-1] = 0, n
+    bounds = np.unique(bounds)
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+
+def parallel_push_relabel(graph, source: int, target: int, workers: int = None,
+                          global_relabel_interval: int = GLOBAL_RELABEL_INTERVAL, stats=None) -> int:
+    # push-relabel in rounds: every worker process discharges one region of the nodes, between rounds
+    # the coordinator applies the pushes over region boundaries and relabels globally; writes the maximum
+    # flow into graph (starting from zero flow) and returns its value
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+    csr.ensure_built()
+    n, m = csr.number_of_nodes(), len(csr.head)
+    workers = workers or os.cpu_count()
+
+    memories = {}
+    arrays = {}
+    try:
+        for name, dtype, length in SHARED:
+            size = n + 1 if length == "nodes + 1" else n if length == "nodes" else m
+            memories[name] = shared_memory.SharedMemory(create=True, size=max(1, size * np.dtype(dtype).itemsize))
+            arrays[name] = np.ndarray(size, dtype=dtype, buffer=memories[name].buf)
+        offsets, head, pair = arrays["offsets"], arrays["head"], arrays["pair"]
+        residual, excess, label = arrays["residual"], arrays["excess"], arrays["label"]
+        offsets[:] = csr.offsets
+        head[:] = csr.head
+        pair[:] = csr.pair
+        capacity = np.frombuffer(csr.capacity, dtype=np.int64)
+        is_reverse = np.frombuffer(csr.is_reverse, dtype=np.int8).astype(bool)
+        tail = np.frombuffer(csr.tail, dtype=np.int32)
+        residual[:] = np.where(is_reverse, 0, capacity)
+        excess[:] = 0
+
+        # preflow: saturate the arcs leaving the source
+        for a in range(offsets[source], offsets[source + 1]):
+            amount = residual[a]
+            residual[a] = 0
+            residual[pair[a]] += amount
+            excess[head[a]] += amount
+            excess[source] -= amount
+        global_relabel(offsets, head, pair, residual, label, source, target)
+        if stats is not None:
+            stats.global_relabels += 1
+        arrays["ghost"][:] = label
+
+        parts = regions(offsets, workers)
+        names = {name: memory.name for name, memory in memories.items()}
+        rounds = 0
+        # whether the labels come from a global relabeling after the last round
+        relabeled = True
+        with ProcessPoolExecutor(max_workers=len(parts), initializer=attach, initargs=(names, n, m)) as executor:
+            while True:
+                # nodes that reached the label limit on stale labels wait for the next global relabeling
+                active = (excess > 0) & (label < 2 * n)
+                active[[source, target]] = False
+                busy = [(lo, hi) for lo, hi in parts if active[lo:hi].any()]
+                if not busy:
+                    if relabeled:
+                        break
+                    global_relabel(offsets, head, pair, residual, label, source, target)
+                    if stats is not None:
+                        stats.global_relabels += 1
+                    arrays["ghost"][:] = label
+                    relabeled = True
+                    continue
+
+                if stats is not None:
+                    stats.start_phase()
+                results = [future.result() for future in
+                           [executor.submit(discharge_region, lo, hi, source, target) for lo, hi in busy]]
+
+                # a boundary push stays valid if its head was not relabeled above label[tail] + 1
+                # in the meantime, otherwise it would create a residual arc that breaks the labeling
+                arcs = np.concatenate([result[0] for result in results])
+                amounts = np.concatenate([result[1] for result in results])
+                tails, ends = tail[arcs], head[arcs]
+                valid = label[ends] <= label[tails] + 1
+                np.add.at(residual, pair[arcs[valid]], amounts[valid])
+                np.add.at(excess, ends[valid], amounts[valid])
+                # refunds
+                np.add.at(residual, arcs[~valid], amounts[~valid])
+                np.add.at(excess, tails[~valid], amounts[~valid])
+
+                rounds += 1
+                relabeled = rounds % global_relabel_interval == 0
+                if relabeled:
+                    global_relabel(offsets, head, pair, residual, label, source, target)
+                    if stats is not None:
+                        stats.global_relabels += 1
+                arrays["ghost"][:] = label
+
+                if stats is not None:
+                    stats.end_phase()
+                    for _, _, saturating, non_saturating, relabels in results:
+                        stats.saturating_pushes += saturating
+                        stats.non_saturating_pushes += non_saturating
+                        stats.relabels += relabels
+
+        flow = np.where(is_reverse, 0, capacity - residual)
+        value = int(excess[target])
+    finally:
+        arrays.clear()
+        for memory in memories.values():
+            memory.close()
+            memory.unlink()
+
+    if csr is graph:
+        graph.flow = array("q", flow.tolist())
+    else:
+        base_edges = graph.get_base_edges()
+        for position, arc_id in enumerate(csr.order):
+            if arc_id % 2 == 0:
+                base_edges[arc_id // 2].flow = int(flow[position])
+    return value
@@ -1,9 +1,14 @@
-import itertools
 import math
 import random
 
 from graph import Graph
-from utils import euclidean_distance, get_source_and_target
+from utils import get_source_and_target
+
+
+MIN_DISTANCE = 3
+# random graphs tried before generate gives up on finding source and target min_distance hops apart
+ATTEMPTS = 20
+NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
 
 
 def line_intersect(p1, q1, p2, q2):
@@ -13,25 +18,55 @@ def line_intersect(p1, q1, p2, q2):
     return ccw(p1, q1, p2) * ccw(p1, q1, q2) < 0 and ccw(p2, q2, p1) * ccw(p2, q2, q1) < 0
 
 
-def generate(n: int, max_capacity: int) -> tuple[int, int, Graph]:
+def planar_grid_graph(n: int, max_capacity: int, rng) -> Graph:
     graph = Graph(n)
+    nodes = graph.get_nodes()
+    rows = math.ceil(math.sqrt(n))
 
-    all_edges = list(itertools.permutations(graph.get_nodes(), 2))
-    random.shuffle(all_edges)
-    all_edges.sort(key=lambda edge: euclidean_distance(*edge))
+    # only neighbouring grid cells are candidates, shorter (axis parallel) ones first
+    all_edges = []
+    for i in range(n):
+        column, row = i % rows, i // rows
+        for dx, dy in NEIGHBOURS:
+            j = (row + dy) * rows + column + dx
+            if 0 <= column + dx < rows and 0 <= j < n:
+                all_edges.append((dx * dx + dy * dy, nodes[i], nodes[j]))
+    rng.shuffle(all_edges)
+    all_edges.sort(key=lambda edge: edge[0])
 
+    # accepted edges by grid cell, edges between grid neighbours can only cross inside the same cell
     edges = []
-    rows = math.ceil(math.sqrt(n))
-    for n1, n2 in all_edges:
-        if (not any(line_intersect(n1, n2, n3, n4) for (n3, n4) in edges)
-                and abs(n1.node_id % rows - n2.node_id % rows) <= 1
-                and abs(n1.node_id // rows - n2.node_id // rows) <= 1):
+    cells = {}
+    for _, n1, n2 in all_edges:
+        cell = (min(n1.node_id % rows, n2.node_id % rows), min(n1.node_id // rows, n2.node_id // rows))
+        if not any(line_intersect(n1, n2, n3, n4) for (n3, n4) in cells.get(cell, ())
+                   if n3 is not n1 and n3 is not n2 and n4 is not n1 and n4 is not n2):
             edges.append((n1, n2))
+            cells.setdefault(cell, []).append((n1, n2))
 
     for n1, n2 in edges:
-        graph.add_edge(n1.node_id, n2.node_id, random.randint(1, max_capacity))
+        graph.add_edge(n1.node_id, n2.node_id, rng.randint(1, max_capacity))
+    return graph
+
 
-    source, target = get_source_and_target(graph)
+def generate(n: int, max_capacity: int, seed: int = None) -> tuple[int, int, Graph]:
+    if n < 2:
+        raise ValueError(f"a graph with a source and a target needs at least 2 nodes, not {n}")
+    if max_capacity < 1:
+        raise ValueError(f"the capacity must be at least 1, not {max_capacity}")
+    rng = random.Random(seed)
+    # in smaller grids every node may be a diagonal step from the next row or column
+    min_distance = min(MIN_DISTANCE, math.ceil(math.sqrt(n)) - 1)
+    for _ in range(ATTEMPTS):
+        graph = planar_grid_graph(n, max_capacity, rng)
+        try:
+            source, target = get_source_and_target(graph, rng, min_distance)
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError(f"no random graph with {n} nodes had a source and target {min_distance} hops apart "
+                         f"in {ATTEMPTS} attempts")
 
     degree_source = graph.get_degree(source) // 2
     for edge in graph.get_edges_by_node(source):
@@ -0,0 +1,554 @@
+import math
+import tkinter as tk
+
+import utils
+
+
+class GraphRenderer:
+    # retained mode: the renderer keeps what was rendered (arc colours, node texts, cut and highlight), but only
+    # the nodes and pairs inside the viewport have canvas items, created when they come into view and deleted
+    # when they leave it. Zoomed out, the level of detail drops from labelled arcs (DETAIL) to thin arcs
+    # coloured by flow utilisation (LINES) and to a grid of cells coloured by the utilisation of their arcs (CELLS)
+    NODE_RADIUS = 20
+    TEXT_OFFSET = 25
+    ANGLE = 10
+    CUT_OFFSET = 20
+    CUT_LENGTH = 10
+    RESULT_TEXT_SIZE = 20
+
+    DETAIL, LINES, CELLS = range(3)
+    # shortest distance between adjacent nodes in pixels from which arcs have arrows and labels,
+    # the arcs between the node circles are then at least 40 pixels long
+    DETAIL_SPACING = 2 * NODE_RADIUS + 40
+    # most nodes in the viewport that are still drawn one by one
+    LINE_BUDGET = 4000
+    CELL_SIZE = 16
+    MAX_ZOOM = 1000
+    # zooming and panning move the existing items at once, the viewport is culled again after this delay
+    UPDATE_DELAY = 50
+    # nodes per side of a cell of the spatial index
+    INDEX_CELL_NODES = 4
+    TAG = "graph"
+
+    def __init__(self, canvas: tk.Canvas):
+        self.canvas = canvas
+        self.graph = None
+        self.source = None
+        self.target = None
+        self.width = 1
+        self.height = 1
+        # screen position = world position * canvas size * zoom + offset
+        self.zoom = 1
+        self.offset_x = 0
+        self.offset_y = 0
+        self.level = None
+        self._pending = None
+
+        # world positions and spatial index of nodes and pairs
+        self.x = []
+        self.y = []
+        self.index_size = 1
+        self.node_index = {}
+        self.pair_index = {}
+        # pairs whose box spans too many index cells, tested one by one
+        self.long_pairs = []
+        # base edges of both directions of a pair and their total capacity
+        self.pair_edges = {}
+        self.pair_capacity = {}
+        # distinct (|dx|, |dy|) between the nodes of a pair, and the shortest pair on the canvas at zoom 1
+        self.pair_extents = set()
+        self.spacing = 1
+
+        # what was rendered: (colour forward, colour reverse) per pair, None for flow / capacity labels
+        self.styles = {}
+        self.texts = {}
+        self.highlighted = None
+        self.cut = None
+
+        self.visible_nodes = set()
+        self.visible_pairs = set()
+        # node -> (oval, text), the text only on the DETAIL level
+        self.node_items = {}
+        # (start, end) -> (line, text background, text) for both directions of every visible pair
+        self.arc_items = {}
+        # pair -> line on the LINES level
+        self.line_items = {}
+        # (start, end) -> cut marker for visible pairs with a base edge from start to end leaving the cut
+        self.cut_items = {}
+        self.highlight_item = None
+        # screen cell -> rectangle on the CELLS level, with the flow and capacity of the pairs in it
+        self.cell_items = {}
+        self.cell_flow = {}
+        self.cell_capacity = {}
+        self.pair_cell = {}
+        self.pair_flow = {}
+        self.dirty_cells = set()
+
+    def build(self, graph, source: int, target: int):
+        self.canvas.delete("all")
+        if self._pending is not None:
+            self.canvas.after_cancel(self._pending)
+            self._pending = None
+        self.graph = graph
+        self.source = source
+        self.target = target
+        self.zoom = 1
+        self.offset_x = 0
+        self.offset_y = 0
+        self.level = None
+
+        nodes = graph.get_nodes()
+        self.x = [node.x for node in nodes]
+        self.y = [node.y for node in nodes]
+        self.index_size = max(1, min(256, math.ceil(math.sqrt(len(nodes)) / self.INDEX_CELL_NODES)))
+        self.node_index = {}
+        for node in range(len(nodes)):
+            self.node_index.setdefault(self.index_cell(self.x[node], self.y[node]), []).append(node)
+
+        self.pair_index = {}
+        self.long_pairs = []
+        self.pair_edges = {}
+        self.pair_capacity = {}
+        self.pair_extents = set()
+        for start, end in graph.get_pairs():
+            pair = (start, end)
+            base_edges = [edge for u, v in (pair, (end, start)) for edge in graph.get_edges_between(u, v)
+                          if not edge.reverse]
+            self.pair_edges[pair] = base_edges
+            self.pair_capacity[pair] = sum(edge.capacity for edge in base_edges)
+            self.pair_extents.add((round(abs(self.x[end] - self.x[start]), 9),
+                                   round(abs(self.y[end] - self.y[start]), 9)))
+
+            cx0, cy0 = self.index_cell(min(self.x[start], self.x[end]), min(self.y[start], self.y[end]))
+            cx1, cy1 = self.index_cell(max(self.x[start], self.x[end]), max(self.y[start], self.y[end]))
+            if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > 4:
+                self.long_pairs.append(pair)
+                continue
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.pair_index.setdefault((cx, cy), []).append(pair)
+
+        self.styles = {}
+        self.texts = {}
+        self.highlighted = None
+        self.cut = None
+        self.clear_items()
+        self.layout()
+
+    def index_cell(self, x: float, y: float):
+        return (min(max(int(x * self.index_size), 0), self.index_size - 1),
+                min(max(int(y * self.index_size), 0), self.index_size - 1))
+
+    def clear_items(self):
+        self.canvas.delete(self.TAG)
+        self.visible_nodes = set()
+        self.visible_pairs = set()
+        self.node_items = {}
+        self.arc_items = {}
+        self.line_items = {}
+        self.cut_items = {}
+        self.highlight_item = None
+        self.cell_items = {}
+        self.cell_flow = {}
+        self.cell_capacity = {}
+        self.pair_cell = {}
+        self.pair_flow = {}
+        self.dirty_cells = set()
+
+    def layout(self):
+        # the view for the current canvas size, everything in it is drawn again
+        if self.graph is None:
+            return
+
+        self.width = max(self.canvas.winfo_width(), 1)
+        self.height = max(self.canvas.winfo_height(), 1)
+        self.spacing = self.pair_spacing()
+        self.offset_x, self.offset_y = self.clamp_offset(self.offset_x, self.offset_y)
+        self.update_view()
+
+    def pair_spacing(self):
+        # the shortest distance between the nodes of a pair at zoom 1, grid graphs have only a few distinct extents
+        if not self.pair_extents:
+            return min(self.width, self.height) / math.ceil(math.sqrt(max(len(self.x), 1)))
+        return min(math.hypot(dx * self.width, dy * self.height) for dx, dy in self.pair_extents)
+
+    def clamp_offset(self, offset_x: float, offset_y: float):
+        # the graph always covers the canvas
+        return (min(max(offset_x, self.width * (1 - self.zoom)), 0),
+                min(max(offset_y, self.height * (1 - self.zoom)), 0))
+
+    def zoom_at(self, x: float, y: float, factor: float):
+        # zooms around the canvas point (x, y)
+        if self.graph is None:
+            return
+        zoom = min(max(self.zoom * factor, 1), self.MAX_ZOOM)
+        factor = zoom / self.zoom
+        if factor == 1:
+            return
+        self.zoom = zoom
+        self.offset_x, self.offset_y = self.clamp_offset(x - (x - self.offset_x) * factor,
+                                                         y - (y - self.offset_y) * factor)
+        self.canvas.scale(self.TAG, x, y, factor, factor)
+        self.schedule_update()
+
+    def pan(self, dx: float, dy: float):
+        if self.graph is None:
+            return
+        offset_x, offset_y = self.clamp_offset(self.offset_x + dx, self.offset_y + dy)
+        if (offset_x, offset_y) == (self.offset_x, self.offset_y):
+            return
+        self.canvas.move(self.TAG, offset_x - self.offset_x, offset_y - self.offset_y)
+        self.offset_x, self.offset_y = offset_x, offset_y
+        self.schedule_update()
+
+    def reset_view(self):
+        self.zoom = 1
+        self.offset_x = 0
+        self.offset_y = 0
+        self.layout()
+
+    def schedule_update(self):
+        if self._pending is None:
+            self._pending = self.canvas.after(self.UPDATE_DELAY, self.update_view)
+
+    def detail_level(self):
+        n = max(len(self.x), 1)
+        if self.spacing * self.zoom >= self.DETAIL_SPACING:
+            return self.DETAIL
+        if n / self.zoom ** 2 <= self.LINE_BUDGET:
+            return self.LINES
+        return self.CELLS
+
+    def update_view(self):
+        # culls the nodes and pairs against the viewport and draws the ones in it on the current level
+        self._pending = None
+        if self.graph is None:
+            return
+
+        level = self.detail_level()
+        if level != self.level:
+            self.clear_items()
+            self.level = level
+        if level == self.CELLS:
+            self.render_cells()
+            return
+
+        nodes, pairs = self.visible()
+        for node in self.visible_nodes - nodes:
+            self.canvas.delete(*self.node_items.pop(node))
+        for pair in self.visible_pairs - pairs:
+            self.delete_pair(pair)
+        self.visible_nodes = nodes
+        self.visible_pairs = pairs
+
+        for node in nodes:
+            self.draw_node(node)
+        for pair in pairs:
+            self.draw_pair(pair)
+        if level == self.DETAIL:
+            self.draw_cut()
+            self.draw_highlight()
+
+    def visible(self):
+        # nodes and pairs whose boxes, widened by the drawing margin, meet the viewport
+        if self.zoom == 1:
+            return set(range(len(self.x))), set(self.pair_edges)
+
+        scale_x, scale_y = self.width * self.zoom, self.height * self.zoom
+        margin = self.NODE_RADIUS + self.TEXT_OFFSET
+        x0, x1 = (-margin - self.offset_x) / scale_x, (self.width + margin - self.offset_x) / scale_x
+        y0, y1 = (-margin - self.offset_y) / scale_y, (self.height + margin - self.offset_y) / scale_y
+        cx0, cy0 = self.index_cell(x0, y0)
+        cx1, cy1 = self.index_cell(x1, y1)
+
+        nodes = set()
+        pairs = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                nodes.update(node for node in self.node_index.get((cx, cy), ())
+                             if x0 <= self.x[node] <= x1 and y0 <= self.y[node] <= y1)
+                pairs.update(self.pair_index.get((cx, cy), ()))
+
+        def meets(pair):
+            start, end = pair
+            return (min(self.x[start], self.x[end]) <= x1 and max(self.x[start], self.x[end]) >= x0 and
+                    min(self.y[start], self.y[end]) <= y1 and max(self.y[start], self.y[end]) >= y0)
+
+        pairs = {pair for pair in pairs if meets(pair)}
+        pairs.update(pair for pair in self.long_pairs if meets(pair))
+        return nodes, pairs
+
+    def position(self, node_id: int):
+        return utils.Point(self.x[node_id] * self.width * self.zoom + self.offset_x,
+                           self.y[node_id] * self.height * self.zoom + self.offset_y)
+
+    def node_radius(self):
+        if self.level == self.DETAIL:
+            return self.NODE_RADIUS
+        return max(1, min(self.NODE_RADIUS, self.spacing * self.zoom / 4))
+
+    def node_box(self, position, radius=NODE_RADIUS):
+        return (position.x - radius, position.y - radius,
+                position.x + radius, position.y + radius)
+
+    def node_color(self, node_id: int):
+        if node_id == self.source:
+            return "blue"
+        if node_id == self.target:
+            return "purple"
+        return "black"
+
+    def draw_node(self, node_id: int):
+        position = self.position(node_id)
+        radius = self.node_radius()
+        if node_id not in self.node_items:
+            if self.level == self.DETAIL:
+                oval = self.canvas.create_oval(0, 0, 0, 0, fill=self.node_color(node_id), tags=self.TAG)
+                self.node_items[node_id] = (oval,
+                                            self.canvas.create_text(0, 0, fill="white",
+                                                                    font=("Helvetica", "10", "bold"),
+                                                                    state=tk.HIDDEN, tags=self.TAG))
+            else:
+                self.node_items[node_id] = (self.canvas.create_oval(0, 0, 0, 0, fill=self.node_color(node_id),
+                                                                    outline="", tags=self.TAG),)
+        items = self.node_items[node_id]
+        self.canvas.coords(items[0], *self.node_box(position, radius))
+        if len(items) > 1:
+            self.canvas.coords(items[1], position.x, position.y)
+            self.draw_node_text(node_id)
+
+    def draw_node_text(self, node_id: int):
+        text = self.texts.get(node_id)
+        if text is None:
+            self.canvas.itemconfig(self.node_items[node_id][1], state=tk.HIDDEN)
+        else:
+            self.canvas.itemconfig(self.node_items[node_id][1], text=text, state=tk.NORMAL)
+
+    def delete_pair(self, pair):
+        start, end = pair
+        for arc in (pair, (end, start)):
+            self.canvas.delete(*self.arc_items.pop(arc, ()))
+            if arc in self.cut_items:
+                self.canvas.delete(self.cut_items.pop(arc))
+        if pair in self.line_items:
+            self.canvas.delete(self.line_items.pop(pair))
+
+    def draw_pair(self, pair):
+        if self.level == self.LINES:
+            self.draw_line(pair)
+            return
+        style = self.styles.get(pair, ("black", "black"))
+        if style is None:
+            self.draw_result_pair(*pair)
+        else:
+            self.draw_residual_pair(*pair, *style)
+
+    def clear_overlays(self):
+        self.texts = {}
+        self.cut = None
+        if self.level == self.DETAIL:
+            for node_id in self.node_items:
+                self.canvas.itemconfig(self.node_items[node_id][1], state=tk.HIDDEN)
+            self.draw_cut()
+        self.highlight(None)
+
+    def node_text(self, node_id: int, text: str = None):
+        if text is None:
+            self.texts.pop(node_id, None)
+        else:
+            self.texts[node_id] = text
+        if self.level == self.DETAIL and node_id in self.node_items:
+            self.draw_node_text(node_id)
+
+    def highlight(self, node_id: int = None):
+        self.highlighted = node_id
+        self.draw_highlight()
+
+    def draw_highlight(self):
+        node_id = self.highlighted
+        if self.level != self.DETAIL or node_id not in self.visible_nodes:
+            if self.highlight_item is not None:
+                self.canvas.itemconfig(self.highlight_item, state=tk.HIDDEN)
+            return
+        if self.highlight_item is None:
+            self.highlight_item = self.canvas.create_oval(0, 0, 0, 0, outline="red", width=3, tags=self.TAG)
+        self.canvas.coords(self.highlight_item, *self.node_box(self.position(node_id)))
+        self.canvas.itemconfig(self.highlight_item, state=tk.NORMAL)
+        self.canvas.tag_raise(self.highlight_item)
+
+    def arc_positions(self, start: int, end: int, double: bool):
+        node1, node2 = self.position(start), self.position(end)
+        x1, y1, x2, y2 = utils.edge_positions(node1, node2, self.NODE_RADIUS)
+
+        if not double:
+            return utils.Point(x1, y1), utils.Point(x2, y2)
+        return (utils.Point(*utils.rotate(node1, utils.Point(x1, y1), math.radians(self.ANGLE))),
+                utils.Point(*utils.rotate(node2, utils.Point(x2, y2), math.radians(-self.ANGLE))))
+
+    def render_arc(self, start: int, end: int, text: str, color: str, double: bool, text_offset, background: bool):
+        if (start, end) not in self.arc_items:
+            # below the nodes, which are created before the first arcs come into view
+            items = (self.canvas.create_line(0, 0, 0, 0, width=3, arrow=tk.LAST, arrowshape=(10, 15, 5),
+                                             state=tk.HIDDEN, tags=self.TAG),
+                     self.canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="", state=tk.HIDDEN,
+                                                  tags=self.TAG),
+                     self.canvas.create_text(0, 0, state=tk.HIDDEN, tags=self.TAG))
+            for item in items:
+                self.canvas.tag_lower(item)
+            self.arc_items[(start, end)] = items
+        line, text_background, text_item = self.arc_items[(start, end)]
+        if text is None:
+            for item in (line, text_background, text_item):
+                self.canvas.itemconfig(item, state=tk.HIDDEN)
+            return
+
+        p1, p2 = self.arc_positions(start, end, double)
+        text_x, text_y = utils.text_position(p1, p2, text_offset)
+
+        self.canvas.coords(line, p1.x, p1.y, p2.x, p2.y)
+        self.canvas.itemconfig(line, fill=color, state=tk.NORMAL)
+        self.canvas.coords(text_item, text_x, text_y)
+        self.canvas.itemconfig(text_item, text=text, state=tk.NORMAL)
+
+        if background:
+            self.canvas.coords(text_background,
+                               text_x - self.RESULT_TEXT_SIZE, text_y - self.RESULT_TEXT_SIZE,
+                               text_x + self.RESULT_TEXT_SIZE, text_y + self.RESULT_TEXT_SIZE)
+        self.canvas.itemconfig(text_background, state=tk.NORMAL if background else tk.HIDDEN)
+
+    def render_pair(self, start: int, end: int, color_forward: str, color_reverse: str):
+        self.styles[(start, end)] = (color_forward, color_reverse)
+        self.refresh_pair((start, end))
+
+    def render_result_pair(self, start: int, end: int):
+        self.styles[(start, end)] = None
+        self.refresh_pair((start, end))
+
+    def refresh_pair(self, pair):
+        # pairs outside the viewport are drawn when they come into view
+        if self.level == self.CELLS:
+            self.update_cell(pair)
+        elif pair in self.visible_pairs:
+            self.draw_pair(pair)
+
+    def draw_residual_pair(self, start: int, end: int, color_forward: str, color_reverse: str):
+        # residual arcs of both directions, rotated apart if both have residual capacity
+        residual_capacity, prev_residual_capacity = utils.aggregated_edge_values(self.graph, start, end)
+        residual_capacity_reverse, prev_residual_capacity_reverse = utils.aggregated_edge_values(self.graph, end, start)
+        double = residual_capacity > 0 and residual_capacity_reverse > 0
+
+        self.render_arc(start, end,
+                        utils.edge_text(residual_capacity, prev_residual_capacity) if residual_capacity > 0 else None,
+                        color_forward, double, self.TEXT_OFFSET, False)
+        self.render_arc(end, start,
+                        utils.edge_text(residual_capacity_reverse, prev_residual_capacity_reverse)
+                        if residual_capacity_reverse > 0 else None,
+                        color_reverse, double, self.TEXT_OFFSET, False)
+
+    def draw_result_pair(self, start: int, end: int):
+        # flow / capacity of the base edges of both directions
+        values = {}
+        for u, v in ((start, end), (end, start)):
+            base_edges = [edge for edge in self.pair_edges[(start, end)] if edge.start == u]
+            if base_edges:
+                values[(u, v)] = (f"{sum(edge.flow for edge in base_edges)}/"
+                                  f"{sum(edge.capacity for edge in base_edges)}")
+
+        for u, v in ((start, end), (end, start)):
+            self.render_arc(u, v, values.get((u, v)), "black", len(values) == 2, 0, True)
+
+    def draw_line(self, pair):
+        # one thin line per pair, coloured by the utilisation of its base edges
+        start, end = pair
+        if pair not in self.line_items:
+            self.line_items[pair] = self.canvas.create_line(0, 0, 0, 0, width=1, tags=self.TAG)
+            self.canvas.tag_lower(self.line_items[pair])
+        p1, p2 = self.position(start), self.position(end)
+        self.canvas.coords(self.line_items[pair], p1.x, p1.y, p2.x, p2.y)
+        self.canvas.itemconfig(self.line_items[pair],
+                               fill=utils.utilisation_color(self.flow(pair), self.pair_capacity[pair]))
+
+    def flow(self, pair):
+        return sum(edge.flow for edge in self.pair_edges[pair])
+
+    def render_cut(self, cut: set[int]):
+        self.cut = set(cut)
+        self.draw_cut()
+
+    def draw_cut(self):
+        for item in self.cut_items.values():
+            self.canvas.delete(item)
+        self.cut_items = {}
+        if self.level != self.DETAIL or self.cut is None:
+            return
+
+        cut = self.cut
+        for pair in self.visible_pairs:
+            for edge in self.pair_edges[pair]:
+                start, end = edge.start, edge.end
+                if start not in cut or end in cut or (start, end) in self.cut_items:
+                    continue
+
+                node1, node2 = self.position(start), self.position(end)
+                x, y, _, _ = utils.edge_positions(node1, node2, self.NODE_RADIUS)
+
+                dx, dy = node2.x - node1.x, node2.y - node1.y
+                length = (dx ** 2 + dy ** 2) ** 0.5
+
+                dx_norm = dx / length
+                dy_norm = dy / length
+
+                x, y = x + self.CUT_OFFSET * dx_norm, y + self.CUT_OFFSET * dy_norm
+                orthogonal_x, orthogonal_y = -dy_norm * self.CUT_LENGTH, dx_norm * self.CUT_LENGTH
+
+                self.cut_items[(start, end)] = self.canvas.create_line(x + orthogonal_x, y + orthogonal_y,
+                                                                       x - orthogonal_x, y - orthogonal_y,
+                                                                       width=3, fill="blue", tags=self.TAG)
+
+    def render_cells(self):
+        # utilisation of the pairs whose midpoint lies in each cell of a grid over the canvas,
+        # source and target stay visible as nodes
+        self.clear_items()
+        _, pairs = self.visible() if self.zoom != 1 else (None, self.pair_edges)
+        scale_x, scale_y = self.width * self.zoom, self.height * self.zoom
+        for pair in pairs:
+            start, end = pair
+            x = (self.x[start] + self.x[end]) / 2 * scale_x + self.offset_x
+            y = (self.y[start] + self.y[end]) / 2 * scale_y + self.offset_y
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                continue
+            cell = (int(x // self.CELL_SIZE), int(y // self.CELL_SIZE))
+            flow = self.flow(pair)
+            self.pair_cell[pair] = cell
+            self.pair_flow[pair] = flow
+            self.cell_flow[cell] = self.cell_flow.get(cell, 0) + flow
+            self.cell_capacity[cell] = self.cell_capacity.get(cell, 0) + self.pair_capacity[pair]
+
+        for (cx, cy), capacity in self.cell_capacity.items():
+            self.cell_items[(cx, cy)] = self.canvas.create_rectangle(
+                cx * self.CELL_SIZE, cy * self.CELL_SIZE, (cx + 1) * self.CELL_SIZE, (cy + 1) * self.CELL_SIZE,
+                fill=utils.utilisation_color(self.cell_flow[(cx, cy)], capacity), outline="", tags=self.TAG)
+
+        for node_id in (self.source, self.target):
+            self.node_items[node_id] = (self.canvas.create_oval(*self.node_box(self.position(node_id), 5),
+                                                                fill=self.node_color(node_id), outline="white",
+                                                                tags=self.TAG),)
+
+    def update_cell(self, pair):
+        if pair not in self.pair_cell:
+            return
+        flow = self.flow(pair)
+        cell = self.pair_cell[pair]
+        self.cell_flow[cell] += flow - self.pair_flow[pair]
+        self.pair_flow[pair] = flow
+        # a full render touches every pair, the cells are recoloured once afterwards
+        if not self.dirty_cells:
+            self.canvas.after_idle(self.recolor_cells)
+        self.dirty_cells.add(cell)
+
+    def recolor_cells(self):
+        for cell in self.dirty_cells:
+            if cell in self.cell_items:
+                self.canvas.itemconfig(self.cell_items[cell],
+                                       fill=utils.utilisation_color(self.cell_flow[cell], self.cell_capacity[cell]))
+        self.dirty_cells = set()
@@ -0,0 +1,63 @@
+import mmap
+import struct
+from array import array
+
+from csr_graph import CSRGraph
+
+# file layout: header, then the arrays below in this order, each padded to a multiple of 8 bytes,
+# flow only if the header has FLOW set
+MAGIC = b"MFSN"
+VERSION = 1
+FLOW = 1
+HEADER = struct.Struct("<4sIqqqqI4x")
+# attribute, typecode, length in nodes or arcs
+ARRAYS = (("offsets", "i", "nodes + 1"),
+          ("head", "i", "arcs"),
+          ("tail", "i", "arcs"),
+          ("pair", "i", "arcs"),
+          ("order", "i", "arcs"),
+          ("is_reverse", "b", "arcs"),
+          ("capacity", "q", "arcs"),
+          ("flow", "q", "arcs"),
+          ("x", "d", "nodes"),
+          ("y", "d", "nodes"))
+
+
+def save(path: str, graph, source: int = -1, target: int = -1, with_flow: bool = False):
+    # a Graph is converted to a CSRGraph first, its base edges keep their order
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_graph(graph, with_flow)
+    graph.ensure_built()
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, graph.n, len(graph.head), source, target, FLOW if with_flow else 0))
+        for name, typecode, _ in ARRAYS:
+            if name == "flow" and not with_flow:
+                continue
+            data = array(typecode, getattr(graph, name)).tobytes()
+            file.write(data)
+            file.write(bytes(-len(data) % 8))
+
+
+def load(path: str) -> tuple[int, int, CSRGraph]:
+    # maps the file copy-on-write: the arrays of the graph are views of the page cache, so loading copies nothing
+    # and processes loading the same snapshot share its pages until they write to them
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    magic, version, n, m, source, target, flags = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        buffer.close()
+        raise ValueError(f"{path} is not a graph snapshot")
+
+    view = memoryview(buffer)
+    arrays = {}
+    offset = HEADER.size
+    for name, typecode, length in ARRAYS:
+        if name == "flow" and not flags & FLOW:
+            continue
+        size = (n + 1 if length == "nodes + 1" else n if length == "nodes" else m) * array(typecode).itemsize
+        arrays[name] = view[offset:offset + size].cast(typecode)
+        offset += size + (-size % 8)
+
+    return source, target, CSRGraph.from_arrays(n, arrays)
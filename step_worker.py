@@ -0,0 +1,120 @@
+import queue
+import threading
+
+import flow_trace
+from algorithms import ALGORITHMS_MAP, changed_edges
+
+
+class StepFrame:
+
+    def __init__(self, result, flows: list):
+        # result has the shape the algorithm yields, but refers to the arcs of the drawn graph
+        self.result = result
+        # (base edge of the drawn graph, its flow after the step)
+        self.flows = flows
+
+
+class StepWorker:
+    # runs an algorithm on a copy of the graph in a daemon thread, ahead of the visualization;
+    # the steps wait in a bounded queue, so a worker that is far enough ahead blocks until frames are taken.
+    # With a trace_path the steps are written to a trace file instead and only the end of the run is queued
+
+    FRAMES = 64
+    PUT_TIMEOUT = 0.1
+
+    def __init__(self, algorithm: str, graph, source: int, target: int, frames: int = FRAMES,
+                 trace_path: str = None):
+        self.algorithm = algorithm
+        self.trace_path = trace_path
+        self.frames = queue.Queue(maxsize=frames)
+        self.done = False
+        self._stop = threading.Event()
+
+        # arcs of the copy -> arcs of the drawn graph, the payloads handed out only refer to the latter
+        self.copy = graph.copy(with_flow=True)
+        self.arcs = {}
+        for edge, edge_copy in zip(graph.get_base_edges(), self.copy.get_base_edges()):
+            self.arcs[edge_copy] = edge
+            self.arcs[edge_copy.reverse_edge] = edge.reverse_edge
+
+        self.algo = ALGORITHMS_MAP[algorithm](self.copy, source, target)
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def run(self):
+        try:
+            if self.trace_path is not None:
+                # the copy has the base edges in the order of the drawn graph, so the trace fits both
+                with flow_trace.TraceWriter(self.trace_path, self.copy) as writer:
+                    for result in self.algo:
+                        if self._stop.is_set():
+                            return
+                        writer.record(changed_edges(self.algorithm, result))
+            else:
+                for result in self.algo:
+                    if not self.put(self.frame(result)):
+                        return
+        except Exception as exception:
+            self.put(exception)
+            return
+        self.put(None)
+
+    def put(self, item) -> bool:
+        # waits for room in the queue, False if the worker was closed meanwhile
+        while not self._stop.is_set():
+            try:
+                self.frames.put(item, timeout=self.PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def frame(self, result) -> StepFrame:
+        # the algorithm keeps changing its arrays after the yield, the frame copies what is drawn
+        arcs = self.arcs
+        edges = []
+        flows = []
+        for edge in changed_edges(self.algorithm, result):
+            edges.append(arcs[edge])
+            base_edge = edge.reverse_edge if edge.reverse else edge
+            flows.append((arcs[base_edge], base_edge.flow))
+
+        match self.algorithm:
+            case "Dinic" | "Dinic (dynamic trees)":
+                _, level = result
+                return StepFrame((edges, list(level)), flows)
+            case "Goldberg-Tarjan" | "Goldberg-Tarjan (highest label)":
+                _, excess, label, node_id, relabeled = result
+                return StepFrame((edges, list(excess), list(label), node_id,
+                                  None if relabeled is None else set(relabeled)), flows)
+            case "Boykov-Kolmogorov":
+                _, tree, parent, changed = result
+                return StepFrame((edges, list(tree), [None if arc is None else arcs[arc] for arc in parent],
+                                  set(changed)), flows)
+            case _:
+                return StepFrame(edges, flows)
+
+    def get(self, block: bool = True):
+        # the next frame, None once the algorithm terminated,
+        # without block also None while the worker has not produced the next step yet
+        if self.done:
+            return None
+        try:
+            item = self.frames.get(block=block)
+        except queue.Empty:
+            return None
+        if item is None:
+            self.done = True
+        elif isinstance(item, Exception):
+            self.done = True
+            raise item
+        return item
+
+    def close(self):
+        self._stop.set()
+        # a worker blocked on a full queue sees the stop flag after its put timeout
+        while True:
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                break
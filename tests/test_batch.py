@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from algorithms import solve
+from batch import solve_batch
+from test_max_flow import instance
+
+
+def scenarios(graph, count: int, seed: int):
+    # capacities around the original ones, also zero, so warm starts raise and lower them
+    rng = random.Random(seed)
+    capacities = [edge.capacity for edge in graph.get_base_edges()]
+    return [[max(0, capacity + rng.randint(-capacity, 10)) for capacity in capacities] for _ in range(count)]
+
+
+def fresh_solve(graph, source: int, target: int, row):
+    graph = graph.copy()
+    for edge, capacity in zip(graph.get_base_edges(), row):
+        edge.capacity = capacity
+    return solve(graph, source, target)
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("warm_start", [True, False], ids=["warm", "cold"])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_same_values_and_cuts_as_fresh_solves(workers, warm_start, csr):
+    source, target, graph = instance(80, 20, 0, csr)
+    capacities = scenarios(graph, 7, workers)
+
+    result = solve_batch(graph, source, target, capacities, workers=workers, cuts=True, warm_start=warm_start)
+    expected = [fresh_solve(graph, source, target, row) for row in capacities]
+    assert result.values == [flow.value for flow in expected]
+    assert result.cuts == [flow.source_side for flow in expected]
+
+
+def test_graph_is_not_changed():
+    source, target, graph = instance(40, 10, 1, False)
+    capacities = [edge.capacity for edge in graph.get_base_edges()]
+    solve_batch(graph, source, target, scenarios(graph, 4, 1), workers=2)
+    assert [edge.capacity for edge in graph.get_base_edges()] == capacities
+
+
+def test_capacity_vectors_of_the_wrong_length():
+    source, target, graph = instance(20, 5, 0, False)
+    with pytest.raises(ValueError):
+        solve_batch(graph, source, target, [[1, 2, 3]])
+    assert solve_batch(graph, source, target, []).values == []
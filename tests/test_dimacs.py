@@ -0,0 +1,57 @@
+import pytest
+
+import dimacs
+import max_flow
+from algorithms import solve
+from test_max_flow import instance
+
+
+def arcs(graph):
+    return sorted((edge.start, edge.end, edge.capacity) for edge in graph.get_base_edges())
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("seed", range(3))
+def test_round_trip(tmp_path, seed, csr):
+    source, target, graph = instance(100, 50, seed, csr)
+    path = tmp_path / "instance.max"
+    dimacs.write(path, graph, source, target)
+
+    read_source, read_target, read_graph = dimacs.read(path)
+    assert (read_source, read_target) == (source, target)
+    assert read_graph.number_of_nodes() == graph.number_of_nodes()
+    assert arcs(read_graph) == arcs(graph)
+
+
+def test_solve_file_writes_the_flow(tmp_path):
+    source, target, graph = instance(60, 20, 0, False)
+    path = tmp_path / "instance.max"
+    flow_path = tmp_path / "instance.flow"
+    dimacs.write(path, graph, source, target)
+
+    value = dimacs.solve_file(path, "Dinic", flow_path)
+    assert value == solve(graph, source, target, max_flow.edmonds_karp).value
+
+    lines = flow_path.read_text().splitlines()
+    assert lines[0] == f"s {value}"
+    flows = sorted(tuple(map(int, line.split()[1:])) for line in lines[1:])
+    assert len(flows) == len(graph.get_base_edges())
+    # flow conservation at every node but source and target, 1-based ids in the file
+    balance = {}
+    for start, end, flow in flows:
+        balance[start] = balance.get(start, 0) - flow
+        balance[end] = balance.get(end, 0) + flow
+    assert all(total == 0 for node, total in balance.items() if node - 1 not in (source, target))
+    assert balance[target + 1] == value
+
+
+@pytest.mark.parametrize("content, message", [("", "empty"),
+                                              ("c only a comment\n", "no problem line"),
+                                              ("p min 2 1\n", "not a max-flow problem"),
+                                              ("p max 2 1\nn 1 s\na 1 2 5\n", "no source or no target"),
+                                              ("p max 2 1\nn 1 s\nn 2 t\na 1 3 5\n", "outside of 1 .. nodes")])
+def test_invalid_files(tmp_path, content, message):
+    path = tmp_path / "invalid.max"
+    path.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        dimacs.read(path)
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+import flow_trace
+from algorithms import ALGORITHMS, ALGORITHMS_MAP, changed_edges
+from step_worker import StepWorker
+from test_max_flow import instance
+
+
+def record(path, algorithm: str, graph, source: int, target: int, checkpoint_interval: int):
+    # writes the trace of a run and returns the live flows after every step, index 0 before the first
+    graph.reset()
+    flows = [[edge.flow for edge in graph.get_base_edges()]]
+    with flow_trace.TraceWriter(path, graph, checkpoint_interval) as writer:
+        for result in ALGORITHMS_MAP[algorithm](graph, source, target):
+            writer.record(changed_edges(algorithm, result))
+            flows.append([edge.flow for edge in graph.get_base_edges()])
+    return flows
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_flows_at_every_step(tmp_path, algorithm, csr):
+    source, target, graph = instance(40, 10, 0, csr)
+    path = tmp_path / "run.trace"
+    live = record(path, algorithm, graph, source, target, 3)
+
+    trace = flow_trace.Trace(path)
+    try:
+        assert trace.steps == len(live) - 1
+        assert trace.arcs == len(graph.get_base_edges())
+        for step, flows in enumerate(live):
+            assert list(trace.flows_at(step)) == flows
+    finally:
+        trace.close()
+
+
+def test_seek_in_any_order_and_back(tmp_path):
+    source, target, graph = instance(60, 20, 1, False)
+    path = tmp_path / "run.trace"
+    live = record(path, "Goldberg-Tarjan", graph, source, target, 4)
+
+    trace = flow_trace.Trace(path)
+    try:
+        # jumps start from the closest checkpoint, in any order
+        steps = list(range(trace.steps + 1))
+        random.Random(0).shuffle(steps)
+        for step in steps:
+            assert list(trace.flows_at(step)) == live[step]
+
+        # back undoes one delta at a time, across the checkpoints
+        flows = trace.flows_at(trace.steps)
+        for step in range(trace.steps, 0, -1):
+            for arc, delta in trace.delta(step):
+                flows[arc] -= delta
+            assert list(flows) == live[step - 1]
+    finally:
+        trace.close()
+
+
+def test_worker_trace_matches_a_live_run(tmp_path):
+    source, target, graph = instance(60, 20, 2, True)
+    graph.reset()
+    path = tmp_path / "worker.trace"
+    worker = StepWorker("Dinic", graph, source, target, trace_path=str(path))
+    while not worker.done:
+        worker.get()
+
+    live = record(tmp_path / "live.trace", "Dinic", graph.copy(), source, target, flow_trace.CHECKPOINT_INTERVAL)
+    trace = flow_trace.Trace(path)
+    try:
+        assert [list(trace.flows_at(step)) for step in range(trace.steps + 1)] == live
+    finally:
+        trace.close()
+
+
+def test_not_a_trace(tmp_path):
+    path = tmp_path / "empty.trace"
+    path.write_bytes(bytes(flow_trace.HEADER.size))
+    with pytest.raises(ValueError):
+        flow_trace.Trace(path)
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import max_flow
+import utils
+from algorithms import ALGORITHMS_MAP, changed_edges, solve
+from flow_tracker import FlowTracker
+from test_max_flow import instance
+
+
+def check(tracker, graph, source: int):
+    assert tracker.value == utils.flow_value(graph, source)
+    assert set(tracker.cut()) == utils.saturated_cut(graph, source)
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("algorithm", ["Edmonds-Karp", "Dinic", "Goldberg-Tarjan", "Boykov-Kolmogorov"])
+def test_every_step_of_a_run(algorithm, seed, csr):
+    source, target, graph = instance(60, 20, seed, csr)
+    graph.reset()
+    tracker = FlowTracker(graph, source)
+    check(tracker, graph, source)
+
+    for result in ALGORITHMS_MAP[algorithm](graph, source, target):
+        tracker.update(changed_edges(algorithm, result))
+        check(tracker, graph, source)
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("seed", range(5))
+def test_capacity_changes(seed, csr):
+    # capacities go up and down, some only down to the flow they carry, so no flow changes on them
+    rng = random.Random(seed)
+    source, target, graph = instance(60, 20, seed, csr)
+    solve(graph, source, target)
+    tracker = FlowTracker(graph, source)
+
+    for _ in range(20):
+        base_edges = graph.get_base_edges()
+        before = [(edge.flow, edge.capacity) for edge in base_edges]
+        changes = []
+        for edge in rng.sample(base_edges, 4):
+            match rng.randrange(3):
+                case 0:
+                    changes.append((edge, edge.flow - edge.capacity))
+                case 1:
+                    changes.append((edge, -rng.randint(0, edge.capacity)))
+                case _:
+                    changes.append((edge, rng.randint(1, 20)))
+        max_flow.update_capacities(graph, source, target, changes)
+
+        tracker.update([edge for edge, state in zip(base_edges, before) if (edge.flow, edge.capacity) != state])
+        check(tracker, graph, source)
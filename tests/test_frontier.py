@@ -0,0 +1,56 @@
+import functools
+
+import pytest
+
+import frontier
+import max_flow
+import random_graph
+import utils
+from algorithms import solve
+from csr_graph import CSRGraph
+from test_max_flow import check_flow
+
+
+def instance(nodes: int, capacity: int, seed: int):
+    source, target, graph = random_graph.generate(nodes, capacity, seed)
+    return source, target, CSRGraph.from_graph(graph)
+
+
+@pytest.mark.parametrize("nodes, capacity", [(20, 5), (100, 20), (400, 100)])
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("algorithm", [functools.partial(max_flow.ford_fulkerson, path_algo=frontier.bfs),
+                                       functools.partial(max_flow.capacity_scaling,
+                                                         path_algo=frontier.bfs_capacity)],
+                         ids=["ford_fulkerson", "capacity_scaling"])
+def test_same_value_as_edmonds_karp(algorithm, seed, nodes, capacity):
+    source, target, graph = instance(nodes, capacity, seed)
+    expected = solve(graph.copy(), source, target, max_flow.edmonds_karp).value
+
+    assert solve(graph, source, target, algorithm).value == expected == utils.flow_value(graph, source)
+    check_flow(graph, source, target)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_same_levels_as_the_scalar_search(seed):
+    # the scalar search stops at the target, the frontier search completes its level
+    source, target, graph = instance(100, 20, seed)
+    graph.reset()
+    parent, level = frontier.bfs(graph, source, target)
+    _, expected = max_flow.bfs(graph, source, target)
+
+    assert level[target] == expected[target]
+    assert all(level[node] == expected[node] for node in range(graph.number_of_nodes()) if expected[node] >= 0)
+    assert len(parent) == graph.number_of_nodes()
+    assert parent[source] is None
+    node = target
+    while node != source:
+        assert parent[node].end == node and parent[node].residual_capacity() > 0
+        assert level[parent[node].start] == level[node] - 1
+        node = parent[node].start
+
+
+def test_unreachable_target():
+    graph = CSRGraph(3)
+    graph.add_edge(0, 1, 1)
+    graph.reset()
+    assert frontier.bfs(graph, 0, 2) is None
@@ -0,0 +1,83 @@
+import sys
+
+import pytest
+
+import max_flow
+import random_graph
+import utils
+from algorithms import solve
+from csr_graph import CSRGraph
+from graph import Graph
+
+SEEDS = range(5)
+INSTANCES = [(20, 5), (60, 20), (150, 100)]
+
+
+def instance(nodes: int, capacity: int, seed: int, csr: bool):
+    source, target, graph = random_graph.generate(nodes, capacity, seed)
+    return source, target, CSRGraph.from_graph(graph) if csr else graph
+
+
+def check_flow(graph, source: int, target: int):
+    # capacity bounds, conservation and no augmenting path left
+    balance = [0] * graph.number_of_nodes()
+    for edge in graph.get_base_edges():
+        assert 0 <= edge.flow <= edge.capacity
+        balance[edge.start] -= edge.flow
+        balance[edge.end] += edge.flow
+    assert all(balance[node] == 0 for node in range(graph.number_of_nodes()) if node not in (source, target))
+    assert max_flow.bfs(graph, source, target) is None
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("nodes, capacity", INSTANCES)
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("algorithm", [max_flow.dinic,
+                                       max_flow.dinic_dynamic_trees,
+                                       max_flow.boykov_kolmogorov,
+                                       max_flow.goldberg_tarjan_highest_label,
+                                       max_flow.edmonds_karp_bidirectional,
+                                       max_flow.capacity_scaling_bidirectional])
+def test_same_value_as_edmonds_karp(algorithm, seed, nodes, capacity, csr):
+    source, target, graph = instance(nodes, capacity, seed, csr)
+    expected = solve(graph.copy(), source, target, max_flow.edmonds_karp).value
+
+    result = solve(graph, source, target, algorithm)
+    assert result.value == expected == utils.flow_value(graph, source)
+    check_flow(graph, source, target)
+    assert target in result.target_side
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+def test_dinic_on_a_path_longer_than_the_recursion_limit(csr):
+    length = 3 * sys.getrecursionlimit()
+    graph = CSRGraph(length + 1) if csr else Graph(length + 1)
+    for u in range(length):
+        graph.add_edge(u, u + 1, 5 + u % 7)
+    assert solve(graph, 0, length, max_flow.dinic).value == 5
+    check_flow(graph, 0, length)
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bidirectional_search_finds_shortest_paths(seed, csr):
+    # on the same residual graph both searches find a path of the same length, or none at all
+    source, target, graph = instance(60, 20, seed, csr)
+    graph.reset()
+    while True:
+        forward = max_flow.bfs(graph, source, target)
+        bidirectional = max_flow.bidirectional_bfs(graph, source, target)
+        assert (forward is None) == (bidirectional is None)
+        if forward is None:
+            break
+        assert len(path_to(forward[0], source, target)) == len(path_to(bidirectional[0], source, target))
+        max_flow.augment(graph, source, target, limit=1)
+
+
+def path_to(parent, source: int, target: int):
+    path = []
+    node = target
+    while node != source:
+        path.append(parent[node])
+        node = parent[node].start
+    return path
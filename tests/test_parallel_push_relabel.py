@@ -0,0 +1,19 @@
+import pytest
+
+import max_flow
+from algorithms import solve
+from parallel_push_relabel import parallel_push_relabel
+from test_max_flow import check_flow, instance
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("global_relabel_interval", [1, 3])
+@pytest.mark.parametrize("seed", range(3))
+def test_same_value_as_edmonds_karp(seed, global_relabel_interval, csr):
+    source, target, graph = instance(200, 50, seed, csr)
+    expected = solve(graph.copy(), source, target, max_flow.edmonds_karp).value
+
+    graph.reset()
+    value = parallel_push_relabel(graph, source, target, workers=2, global_relabel_interval=global_relabel_interval)
+    assert value == expected
+    check_flow(graph, source, target)
@@ -0,0 +1,35 @@
+import math
+
+import pytest
+
+import random_graph
+import utils
+from graph import Graph
+
+
+@pytest.mark.parametrize("n", [2, 3, 5, 16, 100])
+@pytest.mark.parametrize("seed", range(5))
+def test_source_and_target_are_apart(n, seed):
+    source, target, graph = random_graph.generate(n, 10, seed)
+    graph.reset()
+    min_distance = min(random_graph.MIN_DISTANCE, math.ceil(math.sqrt(n)) - 1)
+    assert source != target
+    assert utils.bfs_distances(graph, source)[target] >= min_distance
+
+
+@pytest.mark.parametrize("n", [0, 1])
+def test_too_few_nodes(n):
+    with pytest.raises(ValueError):
+        random_graph.generate(n, 10)
+
+
+def test_single_node_has_no_source_and_target():
+    with pytest.raises(ValueError):
+        utils.get_source_and_target(Graph(1))
+
+
+def test_no_distant_pair():
+    graph = Graph(4)
+    graph.add_edge(0, 1, 1)
+    with pytest.raises(ValueError, match="farthest pair was 1 hops apart"):
+        utils.get_source_and_target(graph, min_distance=2)
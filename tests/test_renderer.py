@@ -0,0 +1,97 @@
+import itertools
+
+import pytest
+
+import max_flow
+import random_graph
+import utils
+from renderer import GraphRenderer
+
+
+class Canvas:
+    # the parts of tk.Canvas the renderer uses, items only keep their coordinates
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.items = {}
+        self.ids = itertools.count(1)
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def create(self, *coords, **options):
+        item = next(self.ids)
+        self.items[item] = coords
+        return item
+
+    create_oval = create_line = create_text = create_rectangle = create
+
+    def coords(self, item, *coords):
+        self.items[item] = coords
+
+    def delete(self, *items):
+        for item in items:
+            if isinstance(item, str):
+                self.items.clear()
+            else:
+                del self.items[item]
+
+    def itemconfig(self, item, **options):
+        assert item in self.items
+
+    def tag_lower(self, item):
+        pass
+
+    def tag_raise(self, item):
+        pass
+
+    def scale(self, *args):
+        pass
+
+    def move(self, *args):
+        pass
+
+    def after(self, delay, callback):
+        return 1
+
+    def after_cancel(self, job):
+        pass
+
+    def after_idle(self, callback):
+        pass
+
+
+@pytest.mark.parametrize("nodes, width, height", [(390, 1180, 800), (100, 1180, 400), (16, 300, 200)])
+@pytest.mark.parametrize("seed", range(3))
+def test_detail_arcs_are_not_degenerate(nodes, width, height, seed):
+    source, target, graph = random_graph.generate(nodes, 20, seed)
+    graph.reset()
+    renderer = GraphRenderer(Canvas(width, height))
+    renderer.build(graph, source, target)
+
+    for _ in range(20):
+        if renderer.level == renderer.DETAIL:
+            # the arcs between adjacent node circles keep a visible length
+            for start, end in graph.get_pairs():
+                p1, p2 = renderer.arc_positions(start, end, False)
+                assert utils.euclidean_distance(p1, p2) >= renderer.DETAIL_SPACING - 2 * renderer.NODE_RADIUS - 1e-6
+
+            for path in max_flow.edmonds_karp(graph, source, target):
+                for edge in path:
+                    renderer.render_pair(edge.start, edge.end, "red", "red")
+            for start, end in graph.get_pairs():
+                renderer.render_result_pair(start, end)
+            renderer.render_cut(utils.saturated_cut(graph, source))
+            return
+        renderer.zoom_at(width / 2, height / 2, 1.25)
+        renderer.update_view()
+    pytest.fail("the detail level is never reached")
+
+
+def test_text_position_of_an_empty_arc():
+    point = utils.Point(3, 4)
+    assert utils.text_position(point, point, 25) == (3, 4)
@@ -0,0 +1,59 @@
+import pytest
+
+import max_flow
+import snapshot
+import utils
+from algorithms import solve
+from test_max_flow import check_flow, instance
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("seed", range(3))
+def test_round_trip(tmp_path, seed, csr):
+    source, target, graph = instance(100, 50, seed, csr)
+    path = tmp_path / "instance.snapshot"
+    snapshot.save(path, graph, source, target)
+
+    loaded_source, loaded_target, loaded = snapshot.load(path)
+    assert (loaded_source, loaded_target) == (source, target)
+    assert loaded.number_of_nodes() == graph.number_of_nodes()
+    # base edges keep their order, so capacity vectors and traces fit both graphs
+    assert ([(edge.start, edge.end, edge.capacity) for edge in loaded.get_base_edges()] ==
+            [(edge.start, edge.end, edge.capacity) for edge in graph.get_base_edges()])
+    assert [(node.x, node.y) for node in loaded.get_nodes()] == [(node.x, node.y) for node in graph.get_nodes()]
+
+    expected = solve(graph, source, target, max_flow.edmonds_karp).value
+    assert solve(loaded, source, target).value == expected
+    check_flow(loaded, source, target)
+
+
+def test_flows_are_kept(tmp_path):
+    source, target, graph = instance(60, 20, 0, False)
+    value = solve(graph, source, target).value
+    path = tmp_path / "solved.snapshot"
+    snapshot.save(path, graph, source, target, with_flow=True)
+
+    _, _, loaded = snapshot.load(path)
+    assert [edge.flow for edge in loaded.get_base_edges()] == [edge.flow for edge in graph.get_base_edges()]
+    check_flow(loaded, source, target)
+    assert utils.flow_value(loaded, source) == value
+
+
+def test_writes_stay_private(tmp_path):
+    # the file is mapped copy-on-write, solving a loaded graph leaves the snapshot unchanged
+    source, target, graph = instance(60, 20, 1, False)
+    path = tmp_path / "instance.snapshot"
+    snapshot.save(path, graph, source, target)
+    content = path.read_bytes()
+
+    _, _, loaded = snapshot.load(path)
+    loaded.get_base_edges()[0].capacity += 1
+    solve(loaded, source, target)
+    assert path.read_bytes() == content
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "invalid.snapshot"
+    path.write_bytes(bytes(snapshot.HEADER.size))
+    with pytest.raises(ValueError, match="not a graph snapshot"):
+        snapshot.load(path)
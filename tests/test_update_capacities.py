@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+import max_flow
+import utils
+from algorithms import solve
+from test_max_flow import check_flow, instance
+
+
+@pytest.mark.parametrize("csr", [False, True], ids=["Graph", "CSRGraph"])
+@pytest.mark.parametrize("seed", range(5))
+def test_same_value_as_fresh_solve(seed, csr):
+    # raises and lowers a few capacities at a time, also to zero, and repairs the previous maximum flow
+    rng = random.Random(seed)
+    source, target, graph = instance(80, 20, seed, csr)
+    solve(graph, source, target)
+
+    for _ in range(10):
+        base_edges = graph.get_base_edges()
+        changes = []
+        for edge in rng.sample(base_edges, 3):
+            changes.append((edge, rng.randint(-edge.capacity, 20)))
+        max_flow.update_capacities(graph, source, target, changes)
+
+        check_flow(graph, source, target)
+        expected = solve(graph.copy(), source, target, max_flow.edmonds_karp).value
+        assert utils.flow_value(graph, source) == expected
@@ -1,10 +1,7 @@
-import itertools
 import math
 import random
-import tkinter as tk
 from collections import deque
 
-import max_flow
 from graph import Graph, Node, Edge
 
 
@@ -46,10 +43,9 @@ def saturated_cut(graph: Graph, source: int):
 def aggregated_edge_values(graph: Graph, start: int, end: int):
     residual_capacity = 0
     prev_residual_capacity = 0
-    for edge in graph.get_edges_by_node(start):
-        if edge.end == end:
-            residual_capacity += edge.residual_capacity()
-            prev_residual_capacity += edge.prev_flow
+    for edge in graph.get_edges_between(start, end):
+        residual_capacity += edge.residual_capacity()
+        prev_residual_capacity += edge.prev_flow
     return residual_capacity, prev_residual_capacity
 
 
@@ -83,6 +79,8 @@ def rotate(origin, point, angle):
 def text_position(p1, p2, offset):
     dx, dy = p2.x - p1.x, p2.y - p1.y
     length = (dx ** 2 + dy ** 2) ** 0.5
+    if length == 0:
+        return p1.x, p1.y
 
     dx_norm = dx / length
     dy_norm = dy / length
@@ -105,63 +103,56 @@ def edge_text(residual_capacity: int, prev_residual_capacity: int):
         return f"{residual_capacity} ({prev_residual_capacity})"
 
 
-def contains_edge(edges: list[Edge], start: int, end: int):
-    for edge in edges:
-        if edge.start == start and edge.end == end:
-            return True
-    return False
+def utilisation_color(flow: int, capacity: int):
+    # light grey for unused arcs, red for saturated ones
+    ratio = min(flow / capacity, 1) if capacity > 0 else 0
+    return "#{:02x}{:02x}{:02x}".format(round(211 + (200 - 211) * ratio), round(211 * (1 - ratio)),
+                                        round(211 * (1 - ratio)))
 
 
-def get_source_and_target(graph: Graph):
-    combinations = list(itertools.combinations(range(graph.number_of_nodes()), 2))
-    random.shuffle(combinations)
+def edge_pairs(edges: list[Edge]) -> set[tuple[int, int]]:
+    return {(min(edge.start, edge.end), max(edge.start, edge.end)) for edge in edges}
 
-    best_pair = (0, 1)
-    max_length = -1
 
-    for s, t in combinations:
-        result = max_flow.dfs(graph, s, t)
-        if result is not None:
-            parent, level = result
+def bfs_distances(graph: Graph, start: int, reverse: bool = False):
+    # hop distances along residual arcs, against the arc direction if reverse is set
+    distance = [-1] * graph.number_of_nodes()
+    distance[start] = 0
+    queue = deque([start])
 
-            length = 0
-            current = t
-            while current != s:
-                current = parent[current].start
-                length += 1
+    while queue:
+        u = queue.popleft()
 
-            if length >= 3:
-                return s, t
-
-            if length > max_length:
-                max_length = length
-                best_pair = (s, t)
-    return best_pair
+        for edge in graph.get_edges_by_node(u):
+            arc = edge.reverse_edge if reverse else edge
+            if distance[edge.end] == -1 and arc.residual_capacity() > 0:
+                distance[edge.end] = distance[u] + 1
+                queue.append(edge.end)
 
+    return distance
 
-class EntryWithPlaceholder(tk.Entry):
-    # https://stackoverflow.com/questions/27820178/how-to-add-placeholder-to-an-entry-in-tkinter
-    def __init__(self, master=None, placeholder="PLACEHOLDER", color="grey", width=15):
-        super().__init__(master, width=width)
 
-        self.placeholder = placeholder
-        self.placeholder_color = color
-        self.default_fg_color = self["fg"]
+def farthest(distance: list[int], rng):
+    max_distance = max(distance)
+    return rng.choice([node for node, d in enumerate(distance) if d == max_distance]), max_distance
 
-        self.bind("<FocusIn>", self.foc_in)
-        self.bind("<FocusOut>", self.foc_out)
 
-        self.put_placeholder()
+def get_source_and_target(graph: Graph, rng=random, min_distance: int = 3, sweeps: int = 4):
+    # double sweeps from random nodes: the node farthest from the start becomes the target,
+    # the node farthest from the target (against the arc direction) the source;
+    # raises ValueError if no sweep finds a pair at least min_distance hops apart
+    if graph.number_of_nodes() < 2:
+        raise ValueError(f"a source and a target need at least 2 nodes, the graph has {graph.number_of_nodes()}")
+    max_length = 0
 
-    def put_placeholder(self):
-        self.insert(0, self.placeholder)
-        self["fg"] = self.placeholder_color
+    for _ in range(sweeps):
+        start = rng.randrange(graph.number_of_nodes())
+        target, _ = farthest(bfs_distances(graph, start), rng)
+        source, length = farthest(bfs_distances(graph, target, reverse=True), rng)
 
-    def foc_in(self, *args):
-        if self["fg"] == self.placeholder_color:
-            self.delete("0", "end")
-            self["fg"] = self.default_fg_color
+        if length >= max(min_distance, 1):
+            return source, target
+        max_length = max(max_length, length)
 
-    def foc_out(self, *args):
-        if not self.get():
-            self.put_placeholder()
+    raise ValueError(f"no source and target {min_distance} hops apart found in {sweeps} sweeps, "
+                     f"the farthest pair was {max_length} hops apart")
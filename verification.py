@@ -0,0 +1,131 @@
+import random
+import time
+
+from tabulate import tabulate
+
+import max_flow
+import random_graph
+import utils
+from algorithms import ALGORITHMS_MAP, changed_edges
+from flow_tracker import FlowTracker
+
+EDGE_CHANGES = 5
+
+
+def instance_seeds(instances: int, seed: int = None):
+    rng = random.Random(seed)
+    return [rng.randrange(2 ** 32) for _ in range(instances)]
+
+
+def run_instance(nodes: int, capacity: int, seed: int, edge_changes: int = EDGE_CHANGES) -> tuple[str, dict]:
+    # solves one random instance with every algorithm and returns the result table and a report for json,
+    # runs in a worker process, so it only takes and returns picklable values
+    rng = random.Random(seed)
+    source, target, graph = random_graph.generate(nodes, capacity, rng.randrange(2 ** 32))
+
+    results = []
+    reports = []
+    flow_values = []
+
+    for name, algo_func in ALGORITHMS_MAP.items():
+        graph.reset()
+
+        # timed and counted without the step payloads and the tracker
+        stats = max_flow.Counters()
+        start_time = time.perf_counter()
+        for _ in algo_func(graph, source, target, record=False, stats=stats):
+            pass
+        elapsed = time.perf_counter() - start_time
+
+        # capacity bound check
+        capacity_bound = True
+        flow_in = [0 for _ in range(graph.number_of_nodes())]
+        flow_out = [0 for _ in range(graph.number_of_nodes())]
+
+        for edge in graph.get_edges():
+            if not edge.reverse:
+                flow_out[edge.start] += edge.flow
+                flow_in[edge.end] += edge.flow
+                if edge.flow > edge.capacity:
+                    capacity_bound = False
+
+        # flow preservation check
+        flow_preservation = all(flow_in[i] == flow_out[i] for i in range(graph.number_of_nodes())
+                                if i not in (source, target))
+
+        saturated_cut = max_flow.bfs(graph, source, target) is None
+
+        flow = flow_out[source] - flow_in[source]
+        flow_values.append(flow)
+
+        # a second run with the tracker following the steps, its value and cut are checked against the final flow
+        graph.reset()
+        tracker = FlowTracker(graph, source)
+        for result in algo_func(graph, source, target):
+            tracker.update(changed_edges(name, result))
+        tracked = (tracker.value == utils.flow_value(graph, source) == flow and
+                   set(tracker.cut()) == utils.saturated_cut(graph, source))
+
+        results.append([name, flow_preservation, capacity_bound, saturated_cut, tracked, flow,
+                        stats.augmentations, stats.arcs_scanned, stats.searches,
+                        f"{stats.saturating_pushes} / {stats.non_saturating_pushes}", stats.relabels, stats.phases,
+                        f"{1000 * elapsed:.2f}"])
+        reports.append({"algorithm": name,
+                        "flow_preservation": flow_preservation,
+                        "capacity_bound": capacity_bound,
+                        "saturated_cut": saturated_cut,
+                        "tracked_flow_and_cut": tracked,
+                        "max_flow": flow,
+                        "time": elapsed,
+                        **stats.as_dict()})
+
+    # change edge values (capacities)
+    change_capacity_passed = True
+    if len(set(flow_values)) == 1:
+        flow_value = flow_values[0]
+
+        for _ in range(edge_changes):
+            graph_copy = graph.copy()
+            index = rng.randrange(len(graph_copy.get_base_edges()))
+            capacity_change = rng.randint(1, capacity)
+
+            flow_values = []
+
+            graph_copy.get_base_edges()[index].capacity += capacity_change
+
+            for name, algo_func in ALGORITHMS_MAP.items():
+                graph_copy.reset()
+                for _ in algo_func(graph_copy, source, target):
+                    pass
+                flow_values.append(utils.flow_value(graph_copy, source))
+
+            # warm start from the flow of the unchanged graph
+            graph_incremental = graph.copy(with_flow=True)
+            max_flow.update_capacities(graph_incremental, source, target,
+                                       [(graph_incremental.get_base_edges()[index], capacity_change)])
+            flow_values.append(utils.flow_value(graph_incremental, source))
+
+            if not all(flow_value <= flow_value_new <= flow_value + capacity_change
+                       for flow_value_new in flow_values):
+                change_capacity_passed = False
+
+            if len(set(flow_values)) != 1:
+                change_capacity_passed = False
+
+    table = ("\n" +
+             tabulate(results,
+                      headers=["Algorithm", "flow preservation", "capacity bound", "saturated cut", "tracked flow/cut",
+                               "max flow",
+                               "augmentations", "arcs scanned", "searches", "pushes (sat. / non-sat.)", "relabels",
+                               "phases", "time (ms)"],
+                      tablefmt="fancy_grid") +
+             "\n" +
+             f"identical max flow value: {len(set(flow_values)) == 1}\n" +
+             f"edge value changes passed: {change_capacity_passed}\n")
+    report = {"nodes": nodes,
+              "capacity": capacity,
+              "seed": seed,
+              "algorithms": reports,
+              "identical_max_flow_value": len(set(flow_values)) == 1,
+              "edge_value_changes_passed": change_capacity_passed}
+    return table, report